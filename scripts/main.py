@@ -48,18 +48,18 @@ def print_step_header(step_num, step_name, description):
     print("="*80)
 
 
-def run_pipeline_step(step_func, step_name):
-    """Run a pipeline step function and capture time"""
+def run_pipeline_step(step_func, step_name, *args):
+    """Run a pipeline step function in-process, returning (success, time, result)"""
     print(f"\n▶️  Executing: {step_name}")
     print("-" * 80)
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         # Run the function
-        result = step_func()
+        result = step_func(*args)
         
-        elapsed_time = time.time() - start_time
+        elapsed_time = time.perf_counter() - start_time
         
         success = result is not None and result is not False
         
@@ -71,10 +71,10 @@ def run_pipeline_step(step_func, step_name):
             
         print(f"  Execution time: {elapsed_time:.2f} seconds")
         
-        return success, elapsed_time
+        return success, elapsed_time, result
     
     except Exception as e:
-        elapsed_time = time.time() - start_time
+        elapsed_time = time.perf_counter() - start_time
         
         print("-" * 80)
         print(f"✗ {step_name} failed with exception!")
@@ -84,7 +84,7 @@ def run_pipeline_step(step_func, step_name):
         import traceback
         traceback.print_exc()
         
-        return False, elapsed_time
+        return False, elapsed_time, None
 
 
 def prompt_continue(step_name):
@@ -138,7 +138,7 @@ def main():
         print_step_header(1, "DATA QUALITY CHECK", 
                          "Analyzing data quality and generating configuration")
         
-        success, elapsed = run_pipeline_step(data_quality_check.main, "Data Quality Check")
+        success, elapsed, config = run_pipeline_step(data_quality_check.main, "Data Quality Check")
         
         execution_log['steps'].append({
             'step': 'check',
@@ -151,8 +151,7 @@ def main():
             execution_log['success'] = False
             return False
         
-        # Load and display configuration
-        config = load_config()
+        # The check returns its configuration; no need to re-read the YAML
         print_config_summary(config)
         
         if not prompt_continue("Transformation"):
@@ -170,7 +169,7 @@ def main():
         print_step_header(2, "DATA TRANSFORMATION",
                          "Cleaning and transforming data based on configuration")
         
-        success, elapsed = run_pipeline_step(transform_pipeline.main, "Data Transformation")
+        success, elapsed, _ = run_pipeline_step(transform_pipeline.main, "Data Transformation", config)
         
         execution_log['steps'].append({
             'step': 'transform',
@@ -197,7 +196,7 @@ def main():
         print_step_header(3, "SQL SERVER LOADING",
                          "Loading cleaned data into SQL Server database")
         
-        success, elapsed = run_pipeline_step(sql_loader.main, "SQL Server Loading")
+        success, elapsed, _ = run_pipeline_step(sql_loader.main, "SQL Server Loading")
         
         execution_log['steps'].append({
             'step': 'load',
@@ -217,24 +216,32 @@ def main():
     # ========================================================================
     
     execution_log['end_time'] = datetime.now().isoformat()
-    execution_log['total_time'] = sum(step['time'] for step in execution_log['steps'])
+    
+    # One pass over the steps: timeline lines, total time and success count
+    timeline = []
+    total_time = 0.0
+    successful_steps = 0
+    for i, step_info in enumerate(execution_log['steps'], 1):
+        total_time += step_info['time']
+        successful_steps += step_info['success']
+        status = "✓" if step_info['success'] else "✗"
+        step_name = step_info['step'].upper()
+        timeline.append(f"  {status} Step {i} ({step_name:15}): {step_info['time']:.2f}s")
+    execution_log['total_time'] = total_time
+    total_steps = len(execution_log['steps'])
     
     print("\n" + "="*80)
     print("PIPELINE EXECUTION SUMMARY")
     print("="*80)
     
     print("\n⏱️  Execution Timeline:")
-    for i, step_info in enumerate(execution_log['steps'], 1):
-        status = "✓" if step_info['success'] else "✗"
-        step_name = step_info['step'].upper()
-        print(f"  {status} Step {i} ({step_name:15}): {step_info['time']:.2f}s")
+    if timeline:
+        print("\n".join(timeline))
     
     print(f"\n  Total execution time: {execution_log['total_time']:.2f} seconds")
     
     # Results summary
     print("\n📊 Results:")
-    successful_steps = sum(1 for s in execution_log['steps'] if s['success'])
-    total_steps = len(execution_log['steps'])
     
     print(f"  Steps completed: {successful_steps}/{total_steps}")
     
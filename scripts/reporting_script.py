@@ -4,13 +4,39 @@ Purpose: Execute SQL queries, generate visualizations, and create analysis repor
 Output: CSV reports + visualizations + HTML summary report
 """
 
+import os
+
+# Keep matplotlib's font cache in one persistent place, so chart workers
+# and repeated runs reuse it instead of rebuilding it
+os.environ.setdefault(
+    'MPLCONFIGDIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache', 'matplotlib')
+)
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import matplotlib
+matplotlib.use('Agg')  # Headless: charts are only written to PNG files
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from string import Template
+from PIL import Image
 import warnings
-import os
+import hashlib
+import html
+import multiprocessing
+import shutil
+import sys
+
+# Ensure src module can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.db import get_engine, SQL_SERVER, SQL_DATABASE, POOL_SIZE
 
 warnings.filterwarnings('ignore')
 
@@ -18,25 +44,61 @@ warnings.filterwarnings('ignore')
 # CONFIGURATION
 # ============================================================================
 
-# SQL Server Connection Settings
-SQL_SERVER = 'DESKTOP-LF8V7TT'
-SQL_DATABASE = 'RetailDB'
-SQL_DRIVER = 'ODBC Driver 17 for SQL Server'
-USE_WINDOWS_AUTH = True
-
-# SQL Server Authentication credentials (if USE_WINDOWS_AUTH = False)
-SQL_USERNAME = 'your_username'
-SQL_PASSWORD = 'your_password'
-
 # Output Configuration
 OUTPUT_DIR = 'reports'
 REPORT_DATE = datetime.now().strftime('%Y%m%d_%H%M%S')
 
+# Queries run concurrently, each on its own pooled connection
+QUERY_WORKERS = POOL_SIZE
+
+# Charts are rendered in parallel worker processes
+PLOT_WORKERS = os.cpu_count() or 1
+
+# Chart workers start clean rather than forking a process that is running the
+# CSV export thread ('forkserver' where available, otherwise 'spawn')
+PLOT_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Charts are viewed on screen in the HTML report; raise for print quality
+CHART_DPI = 150
+
+# Per-row detail queries that only feed CSVs: streamed to disk in chunks
+STREAMED_QUERIES = ['customer_spending', 'customers_no_orders']
+STREAM_CHUNK_SIZE = 128 * 1024
+
+# Spending segments, labelled in pandas rather than by a per-row SQL CASE
+LOW_SPENDER_LIMIT = 500
+MEDIUM_SPENDER_LIMIT = 2000
+SEGMENT_LABELS = ['No Orders', 'Low Spender', 'Medium Spender', 'High Spender']
+
+# Reuse query results while the database is unchanged (--no-cache disables)
+USE_QUERY_CACHE = True
+QUERY_CACHE_DIR = os.path.join(OUTPUT_DIR, '.cache')
+
+# Rendered charts are reused while their input data is unchanged (--no-cache
+# disables); bump the version whenever chart code or styling changes
+USE_CHART_CACHE = True
+CHART_CACHE_DIR = os.path.join(QUERY_CACHE_DIR, 'charts')
+CHART_CACHE_VERSION = 1
+
+# Freshness token: the exact row count and a checksum over every row of each
+# table the reports read, so any insert, update or delete changes it. This
+# scans each table once (cheap at this database's size); checksums can collide
+# in rare cases, so --no-cache is the way to force fresh results
+REPORT_TABLES = [
+    'Brands', 'Categories', 'Stores', 'Staffs',
+    'Products', 'Customers', 'Orders', 'OrderItems', 'Stocks'
+]
+DB_CHANGE_TOKEN_SQL = "\nUNION ALL\n".join(
+    f"SELECT '{table}', COUNT_BIG(*), CHECKSUM_AGG(BINARY_CHECKSUM(*)) FROM {table}"
+    for table in REPORT_TABLES
+)
+
 # Visualization Settings
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 plt.rcParams['figure.figsize'] = (12, 6)
 plt.rcParams['font.size'] = 10
+plt.rcParams['font.family'] = 'DejaVu Sans'  # Bundled font: no fallback lookups
 
 print("="*80)
 print("RETAIL DATABASE ANALYSIS & REPORTING")
@@ -53,18 +115,7 @@ def create_connection():
     print("\n🔗 Connecting to SQL Server...")
     
     try:
-        if USE_WINDOWS_AUTH:
-            connection_string = (
-                f'mssql+pyodbc://{SQL_SERVER}/{SQL_DATABASE}?'
-                f'driver={SQL_DRIVER}&trusted_connection=yes'
-            )
-        else:
-            connection_string = (
-                f'mssql+pyodbc://{SQL_USERNAME}:{SQL_PASSWORD}@'
-                f'{SQL_SERVER}/{SQL_DATABASE}?driver={SQL_DRIVER}'
-            )
-        
-        engine = create_engine(connection_string)
+        engine = get_engine()
         
         # Test connection
         with engine.connect() as conn:
@@ -83,19 +134,25 @@ def create_connection():
 
 QUERIES = {
     # Sales Analysis
-    'top_products': """
-        SELECT TOP 10
+    # Per-product sales: one scan of OrderItems feeds top_products,
+    # revenue_by_category and revenue_by_brand (see DERIVED_QUERIES)
+    'product_sales': """
+        SELECT 
             p.product_id,
             p.product_name,
             p.brand_name,
             p.category_name,
+            b.brand_name AS brand_group,
+            c.category_name AS category_group,
             SUM(oi.quantity) AS total_quantity_sold,
             SUM(oi.total_price) AS total_revenue,
             AVG(oi.list_price) AS avg_selling_price
         FROM OrderItems oi
         INNER JOIN Products p ON oi.product_id = p.product_id
-        GROUP BY p.product_id, p.product_name, p.brand_name, p.category_name
-        ORDER BY total_quantity_sold DESC
+        LEFT JOIN Brands b ON p.brand_id = b.brand_id
+        LEFT JOIN Categories c ON p.category_id = c.category_id
+        GROUP BY p.product_id, p.product_name, p.brand_name, p.category_name,
+                 b.brand_name, c.category_name
     """,
     
     'top_customers': """
@@ -113,6 +170,27 @@ QUERIES = {
         ORDER BY total_spent DESC
     """,
     
+    # Segment sizes for charts and totals (same buckets as customer_spending)
+    'customer_segment_counts': """
+        SELECT 
+            customer_segment,
+            COUNT(*) AS customer_count
+        FROM (
+            SELECT 
+                CASE 
+                    WHEN COUNT(o.order_id) = 0 THEN 'No Orders'
+                    WHEN SUM(o.order_total) < 500 THEN 'Low Spender'
+                    WHEN SUM(o.order_total) BETWEEN 500 AND 2000 THEN 'Medium Spender'
+                    ELSE 'High Spender'
+                END AS customer_segment
+            FROM Customers c
+            LEFT JOIN Orders o ON c.customer_id = o.customer_id
+            GROUP BY c.customer_id
+        ) segments
+        GROUP BY customer_segment
+        ORDER BY customer_count DESC, customer_segment
+    """,
+    
     'revenue_by_store': """
         SELECT 
             s.store_id,
@@ -127,19 +205,6 @@ QUERIES = {
         ORDER BY total_revenue DESC
     """,
     
-    'revenue_by_category': """
-        SELECT 
-            c.category_name,
-            COUNT(DISTINCT p.product_id) AS number_of_products,
-            SUM(oi.quantity) AS total_quantity_sold,
-            SUM(oi.total_price) AS total_revenue
-        FROM Categories c
-        INNER JOIN Products p ON c.category_id = p.category_id
-        INNER JOIN OrderItems oi ON p.product_id = oi.product_id
-        GROUP BY c.category_name
-        ORDER BY total_revenue DESC
-    """,
-    
     'monthly_sales': """
         SELECT 
             YEAR(o.order_date) AS order_year,
@@ -202,22 +267,6 @@ QUERIES = {
         ORDER BY total_orders_handled DESC
     """,
     
-    'best_staff': """
-        SELECT TOP 1
-            st.staff_id,
-            st.first_name + ' ' + st.last_name AS staff_name,
-            s.store_name,
-            COUNT(DISTINCT o.order_id) AS total_orders_handled,
-            SUM(o.order_total) AS total_sales_revenue,
-            AVG(o.order_total) AS avg_order_value
-        FROM Staffs st
-        INNER JOIN Orders o ON st.staff_id = o.staff_id
-        LEFT JOIN Stores s ON st.store_id = s.store_id
-        WHERE st.active = 1
-        GROUP BY st.staff_id, st.first_name, st.last_name, s.store_name
-        ORDER BY total_sales_revenue DESC
-    """,
-    
     # Customer Insights
     'customers_no_orders': """
         SELECT 
@@ -240,13 +289,7 @@ QUERIES = {
             c.state,
             COUNT(o.order_id) AS total_orders,
             ISNULL(SUM(o.order_total), 0) AS total_spent,
-            ISNULL(AVG(o.order_total), 0) AS avg_order_value,
-            CASE 
-                WHEN COUNT(o.order_id) = 0 THEN 'No Orders'
-                WHEN SUM(o.order_total) < 500 THEN 'Low Spender'
-                WHEN SUM(o.order_total) BETWEEN 500 AND 2000 THEN 'Medium Spender'
-                ELSE 'High Spender'
-            END AS customer_segment
+            ISNULL(AVG(o.order_total), 0) AS avg_order_value
         FROM Customers c
         LEFT JOIN Orders o ON c.customer_id = o.customer_id
         GROUP BY c.customer_id, c.full_name, c.city, c.state
@@ -254,19 +297,6 @@ QUERIES = {
     """,
     
     # Additional Insights
-    'revenue_by_brand': """
-        SELECT 
-            b.brand_name,
-            COUNT(DISTINCT p.product_id) AS number_of_products,
-            SUM(oi.quantity) AS total_quantity_sold,
-            SUM(oi.total_price) AS total_revenue
-        FROM Brands b
-        INNER JOIN Products p ON b.brand_id = p.brand_id
-        INNER JOIN OrderItems oi ON p.product_id = oi.product_id
-        GROUP BY b.brand_name
-        ORDER BY total_revenue DESC
-    """,
-    
     'order_status_dist': """
         SELECT 
             order_status,
@@ -285,24 +315,239 @@ QUERIES = {
     """
 }
 
+# Wrap each query as a SQLAlchemy text() clause once, at import
+QUERIES = {query_name: text(query_sql) for query_name, query_sql in QUERIES.items()}
+
+
+def top_products(product_sales):
+    """Top 10 products by quantity sold"""
+    top = product_sales.sort_values('total_quantity_sold', ascending=False, kind='stable').head(10)
+    columns = ['product_id', 'product_name', 'brand_name', 'category_name',
+               'total_quantity_sold', 'total_revenue', 'avg_selling_price']
+    return top[columns].reset_index(drop=True)
+
+
+def revenue_by_group(product_sales, group_column, name_column):
+    """Products, quantity and revenue per brand or category, by revenue"""
+    grouped = (
+        product_sales.dropna(subset=[group_column])
+        .groupby(group_column, sort=False)
+        .agg(number_of_products=('product_id', 'size'),
+             total_quantity_sold=('total_quantity_sold', 'sum'),
+             total_revenue=('total_revenue', 'sum'))
+        .rename_axis(name_column)
+        .reset_index()
+    )
+    return grouped.sort_values('total_revenue', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def best_staff(staff_orders):
+    """Active staff member with the highest sales revenue"""
+    with_orders = staff_orders[staff_orders['total_orders_handled'] > 0]
+    best = with_orders.sort_values('total_sales_revenue', ascending=False, kind='stable')
+    return best.head(1).reset_index(drop=True)
+
+
+# Results computed in pandas from another query's rows instead of rescanning
+# the same tables: name -> (source query, derive function)
+DERIVED_QUERIES = {
+    'top_products': ('product_sales', top_products),
+    'revenue_by_category': ('product_sales', lambda df: revenue_by_group(df, 'category_group', 'category_name')),
+    'revenue_by_brand': ('product_sales', lambda df: revenue_by_group(df, 'brand_group', 'brand_name')),
+    'best_staff': ('staff_orders', best_staff),
+}
+
+# Source-only queries, dropped from the results once derived from
+HELPER_QUERIES = ['product_sales']
+
 # ============================================================================
 # DATA RETRIEVAL
 # ============================================================================
 
-def execute_queries(engine):
+def get_db_change_token(engine):
+    """Return a token that changes whenever the loaded data does (None on failure)"""
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text(DB_CHANGE_TOKEN_SQL)).fetchall()
+        return "|".join(":".join(map(str, row)) for row in rows)
+    except Exception as e:
+        print(f"  ⚠️  Query cache disabled, change token unavailable: {e}")
+        return None
+
+
+def query_cache_key(query_sql, token):
+    """Cache key for one query's result at one database state"""
+    return hashlib.sha1((query_sql.text + token).encode()).hexdigest()
+
+
+def prune_cache_dir(directory, keep):
+    """Delete the files in directory (not subdirectories) not named in keep"""
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name not in keep:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass  # Pruning is best effort
+
+
+def downcast_integers(df):
+    """Shrink int64 columns to the smallest integer type that holds their values"""
+    # Floats stay float64: float32 would change the money values in the reports
+    for column in df.select_dtypes('integer').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def read_sql_cached(query_sql, engine, token):
+    """Run a query, or load its result from the cache; returns (df, cache_hit)"""
+    if token is None:
+        return downcast_integers(pd.read_sql(query_sql, engine)), False
+    
+    key = query_cache_key(query_sql, token)
+    cache_file = os.path.join(QUERY_CACHE_DIR, f"{key}.parquet")
+    
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_parquet(cache_file), True
+        except Exception:
+            pass  # Unreadable entry: run the query again
+    
+    df = downcast_integers(pd.read_sql(query_sql, engine))
+    try:
+        df.to_parquet(cache_file, index=False)
+    except Exception:
+        pass  # Caching is best effort
+    return df, False
+
+
+def add_customer_segment(df):
+    """Label each customer's spending segment (No Orders / Low / Medium / High)"""
+    spent = df['total_spent'].to_numpy()
+    conditions = [
+        df['total_orders'].to_numpy() == 0,
+        spent < LOW_SPENDER_LIMIT,
+        spent <= MEDIUM_SPENDER_LIMIT,
+    ]
+    df['customer_segment'] = np.select(conditions, SEGMENT_LABELS[:3], default=SEGMENT_LABELS[3])
+    return df
+
+
+# Per-chunk post-processing for queries whose columns are derived in pandas
+QUERY_TRANSFORMS = {
+    'customer_spending': add_customer_segment,
+}
+
+
+def write_csv(df, path_or_file, include_header=True):
+    """Write a DataFrame as CSV with Arrow's multi-threaded C++ writer"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    options = pacsv.WriteOptions(include_header=include_header, quoting_style='needed')
+    pacsv.write_csv(table, path_or_file, write_options=options)
+
+
+def stream_sql_cached(query_sql, engine, token, csv_path, transform=None):
+    """Write a query's rows to csv_path chunk by chunk; returns (rows, cache_hit)"""
+    cache_file = None
+    if token is not None:
+        key = query_cache_key(query_sql, token)
+        cache_file = os.path.join(QUERY_CACHE_DIR, f"{key}.csv")
+        if os.path.exists(cache_file):
+            shutil.copyfile(cache_file, csv_path)
+            return None, True
+    
+    # Only one chunk is held in memory; empty results leave no file behind
+    rows = 0
+    with open(csv_path, 'wb') as f:
+        for chunk in pd.read_sql(query_sql, engine, chunksize=STREAM_CHUNK_SIZE):
+            if chunk.empty:
+                continue
+            if transform is not None:
+                chunk = transform(chunk)
+            write_csv(chunk, f, include_header=not rows)
+            rows += len(chunk)
+    if not rows:
+        os.remove(csv_path)
+    
+    if rows and cache_file is not None:
+        try:
+            shutil.copyfile(csv_path, cache_file)
+        except OSError:
+            pass  # Caching is best effort
+    return rows, False
+
+
+def get_csv_dir():
+    """Create and return this run's CSV report directory"""
+    csv_dir = os.path.join(OUTPUT_DIR, 'csv', REPORT_DATE)
+    os.makedirs(csv_dir, exist_ok=True)
+    return csv_dir
+
+
+def execute_queries(engine, use_cache=None):
     """Execute all analysis queries and return results"""
     print("\n📊 Executing Analysis Queries...")
     
-    results = {}
+    if use_cache is None:
+        use_cache = USE_QUERY_CACHE
     
-    for query_name, query_sql in QUERIES.items():
-        try:
-            df = pd.read_sql(query_sql, engine)
-            results[query_name] = df
-            print(f"  ✅ {query_name}: {len(df)} rows")
-        except Exception as e:
-            print(f"  ❌ {query_name}: {e}")
-            results[query_name] = None
+    token = None
+    if use_cache:
+        os.makedirs(QUERY_CACHE_DIR, exist_ok=True)
+        token = get_db_change_token(engine)
+    
+    # Pre-fill in QUERIES order so reports keep a stable ordering
+    results = dict.fromkeys([*QUERIES, *DERIVED_QUERIES])
+    hits = misses = 0
+    
+    csv_dir = get_csv_dir()
+    
+    # Queries are independent and IO-bound, so run them side by side
+    with ThreadPoolExecutor(max_workers=QUERY_WORKERS) as executor:
+        futures = {}
+        for query_name, query_sql in QUERIES.items():
+            if query_name in STREAMED_QUERIES:
+                csv_path = os.path.join(csv_dir, f"{query_name}.csv")
+                future = executor.submit(
+                    stream_sql_cached, query_sql, engine, token, csv_path,
+                    QUERY_TRANSFORMS.get(query_name)
+                )
+            else:
+                future = executor.submit(read_sql_cached, query_sql, engine, token)
+            futures[future] = query_name
+        
+        for future in as_completed(futures):
+            query_name = futures[future]
+            try:
+                result, hit = future.result()
+                if hit:
+                    hits += 1
+                else:
+                    misses += 1
+                source = " (cached)" if hit else ""
+                
+                # Streamed queries are already on disk and stay out of results
+                if query_name in STREAMED_QUERIES:
+                    rows = "" if result is None else f"{result} rows "
+                    print(f"  ✅ {query_name}: {rows}streamed to CSV{source}")
+                else:
+                    results[query_name] = result
+                    print(f"  ✅ {query_name}: {len(result)} rows{source}")
+            except Exception as e:
+                print(f"  ❌ {query_name}: {e}")
+    
+    for query_name, (source, derive) in DERIVED_QUERIES.items():
+        if results.get(source) is not None:
+            results[query_name] = downcast_integers(derive(results[source]))
+    for query_name in HELPER_QUERIES:
+        results.pop(query_name, None)
+    
+    if token is not None:
+        print(f"\n  Query cache: {hits} hits, {misses} misses")
+        # Entries from earlier database states can never be hit again
+        prune_cache_dir(QUERY_CACHE_DIR, {
+            f"{query_cache_key(query_sql, token)}.{'csv' if name in STREAMED_QUERIES else 'parquet'}"
+            for name, query_sql in QUERIES.items()
+        })
     
     return results
 
@@ -314,14 +559,13 @@ def save_csv_reports(results):
     """Save all analysis results to CSV files"""
     print("\n💾 Saving CSV Reports...")
     
-    # Create output directory
-    csv_dir = os.path.join(OUTPUT_DIR, 'csv', REPORT_DATE)
-    os.makedirs(csv_dir, exist_ok=True)
+    # Create output directory (streamed queries were written during fetch)
+    csv_dir = get_csv_dir()
     
     for query_name, df in results.items():
         if df is not None and not df.empty:
             filename = os.path.join(csv_dir, f"{query_name}.csv")
-            df.to_csv(filename, index=False)
+            write_csv(df, filename)
             print(f"  ✅ {query_name}.csv")
     
     print(f"\n📁 CSV reports saved to: {csv_dir}")
@@ -331,148 +575,239 @@ def save_csv_reports(results):
 # VISUALIZATIONS
 # ============================================================================
 
-def create_visualizations(results):
+# Single-axes figure reused by every simple chart drawn in this process
+_shared_ax = None
+
+
+def _reusable_axes(figsize):
+    """Return this process's shared axes, cleared and resized to figsize"""
+    global _shared_ax
+    if _shared_ax is None:
+        _, _shared_ax = plt.subplots(layout='constrained')
+    _shared_ax.clear()
+    _shared_ax.figure.set_size_inches(figsize)
+    return _shared_ax
+
+
+def _share_labels(values):
+    """Bar labels showing each value and its share of the total"""
+    total = values.sum()
+    return [f"{value:,.0f} ({value / total:.1%})" for value in values]
+
+
+def _plot_top_products(df, out_path):
+    """1. Top 10 products bar chart"""
+    ax = _reusable_axes((12, 6))
+    df = df.head(10)
+    ax.barh(df['product_name'], df['total_quantity_sold'], color='steelblue')
+    ax.set_xlabel('Total Quantity Sold')
+    ax.set_title('Top 10 Best-Selling Products', fontsize=14, fontweight='bold')
+    ax.invert_yaxis()
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_revenue_by_store(df, out_path):
+    """2. Revenue by store"""
+    ax = _reusable_axes((10, 6))
+    ax.bar(df['store_name'], df['total_revenue'], color='coral')
+    ax.set_xlabel('Store')
+    ax.set_ylabel('Total Revenue ($)')
+    ax.set_title('Revenue by Store', fontsize=14, fontweight='bold')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_revenue_by_category(df, out_path):
+    """3. Revenue by category"""
+    ax = _reusable_axes((10, 8))
+    df = df.sort_values('total_revenue', ascending=True)
+    bars = ax.barh(df['category_name'], df['total_revenue'])
+    ax.bar_label(bars, labels=_share_labels(df['total_revenue']), padding=3)
+    ax.margins(x=0.15)  # Room for the value labels
+    ax.set_xlabel('Total Revenue ($)')
+    ax.set_title('Revenue Distribution by Category', fontsize=14, fontweight='bold')
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_monthly_sales(df, out_path):
+    """4. Monthly sales trend"""
+    df = df.copy()
+    df['year_month'] = df['order_year'].astype(str) + '-' + df['order_month'].astype(str).str.zfill(2)
+    
+    fig, ax1 = plt.subplots(figsize=(14, 6), layout='constrained')
+    
+    ax1.plot(df['year_month'], df['total_revenue'], marker='o', color='green', linewidth=2, label='Revenue')
+    ax1.set_xlabel('Month')
+    ax1.set_ylabel('Total Revenue ($)', color='green')
+    ax1.tick_params(axis='y', labelcolor='green')
+    ax1.tick_params(axis='x', rotation=45)
+    
+    ax2 = ax1.twinx()
+    ax2.plot(df['year_month'], df['total_orders'], marker='s', color='blue', linewidth=2, label='Orders')
+    ax2.set_ylabel('Total Orders', color='blue')
+    ax2.tick_params(axis='y', labelcolor='blue')
+    
+    plt.title('Monthly Sales Trend', fontsize=14, fontweight='bold')
+    plt.savefig(out_path, dpi=CHART_DPI)
+    plt.close()
+
+
+def _plot_staff_performance(df, out_path):
+    """5. Staff performance"""
+    ax = _reusable_axes((12, 6))
+    df = df.sort_values('total_sales_revenue', ascending=True)
+    ax.barh(df['staff_name'], df['total_sales_revenue'], color='purple')
+    ax.set_xlabel('Total Sales Revenue ($)')
+    ax.set_title('Staff Performance by Sales Revenue', fontsize=14, fontweight='bold')
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_customer_segmentation(df, out_path):
+    """6. Customer segmentation"""
+    ax = _reusable_axes((10, 6))
+    colors = ['#ff9999','#66b3ff','#99ff99','#ffcc99']
+    df = df.sort_values('customer_count', ascending=True)
+    bars = ax.barh(df['customer_segment'], df['customer_count'], color=colors[:len(df)])
+    ax.bar_label(bars, labels=_share_labels(df['customer_count']), padding=3)
+    ax.margins(x=0.15)  # Room for the value labels
+    ax.set_xlabel('Number of Customers')
+    ax.set_title('Customer Segmentation', fontsize=14, fontweight='bold')
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_revenue_by_brand(df, out_path):
+    """7. Revenue by brand"""
+    ax = _reusable_axes((12, 6))
+    df = df.sort_values('total_revenue', ascending=True)
+    ax.barh(df['brand_name'], df['total_revenue'], color='teal')
+    ax.set_xlabel('Total Revenue ($)')
+    ax.set_title('Revenue by Brand', fontsize=14, fontweight='bold')
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_order_status_dist(df, out_path):
+    """8. Order status distribution"""
+    ax = _reusable_axes((10, 6))
+    ax.bar(df['status_name'], df['order_count'], color='orange')
+    ax.set_xlabel('Order Status')
+    ax.set_ylabel('Number of Orders')
+    ax.set_title('Order Status Distribution', fontsize=14, fontweight='bold')
+    for i, (count, pct) in enumerate(zip(df['order_count'], df['percentage'])):
+        ax.text(i, count, f"{count}\n({pct}%)", ha='center', va='bottom')
+    ax.figure.savefig(out_path, dpi=CHART_DPI)
+
+
+def _plot_store_inventory(df, out_path):
+    """9. Store inventory comparison"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), layout='constrained')
+    
+    ax1.bar(df['store_name'], df['total_inventory_units'], color='skyblue')
+    ax1.set_xlabel('Store')
+    ax1.set_ylabel('Total Inventory Units')
+    ax1.set_title('Inventory Units by Store')
+    ax1.tick_params(axis='x', rotation=45)
+    
+    ax2.bar(df['store_name'], df['total_inventory_value'], color='lightcoral')
+    ax2.set_xlabel('Store')
+    ax2.set_ylabel('Total Inventory Value ($)')
+    ax2.set_title('Inventory Value by Store')
+    ax2.tick_params(axis='x', rotation=45)
+    
+    plt.savefig(out_path, dpi=CHART_DPI)
+    plt.close()
+
+
+# (query name, columns used, plot function, file name, label) per chart
+CHARTS = [
+    ('top_products', ['product_name', 'total_quantity_sold'],
+     _plot_top_products, '1_top_products.png', 'Top Products Chart'),
+    ('revenue_by_store', ['store_name', 'total_revenue'],
+     _plot_revenue_by_store, '2_revenue_by_store.png', 'Revenue by Store Chart'),
+    ('revenue_by_category', ['category_name', 'total_revenue'],
+     _plot_revenue_by_category, '3_revenue_by_category.png', 'Revenue by Category Chart'),
+    ('monthly_sales', ['order_year', 'order_month', 'total_revenue', 'total_orders'],
+     _plot_monthly_sales, '4_monthly_sales_trend.png', 'Monthly Sales Trend Chart'),
+    ('staff_orders', ['staff_name', 'total_sales_revenue'],
+     _plot_staff_performance, '5_staff_performance.png', 'Staff Performance Chart'),
+    ('customer_segment_counts', ['customer_segment', 'customer_count'],
+     _plot_customer_segmentation, '6_customer_segmentation.png', 'Customer Segmentation Chart'),
+    ('revenue_by_brand', ['brand_name', 'total_revenue'],
+     _plot_revenue_by_brand, '7_revenue_by_brand.png', 'Revenue by Brand Chart'),
+    ('order_status_dist', ['status_name', 'order_count', 'percentage'],
+     _plot_order_status_dist, '8_order_status_dist.png', 'Order Status Distribution Chart'),
+    ('store_inventory', ['store_name', 'total_inventory_units', 'total_inventory_value'],
+     _plot_store_inventory, '9_store_inventory.png', 'Store Inventory Charts'),
+]
+
+
+def _dispatch(task):
+    """Worker entry point: draw one chart"""
+    plot_func, df, out_path = task
+    plot_func(df, out_path)
+
+
+def chart_cache_path(plot_func, df):
+    """Cache file for a chart, keyed on its plot function and input data"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{CHART_CACHE_VERSION}:{CHART_DPI}:{plot_func.__name__}:{list(df.columns)}".encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return os.path.join(CHART_CACHE_DIR, f"{digest.hexdigest()}.png")
+
+
+def create_visualizations(results, use_cache=None):
     """Create visualizations for analysis results"""
     print("\n📈 Generating Visualizations...")
     
+    if use_cache is None:
+        use_cache = USE_CHART_CACHE
+    if use_cache:
+        os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    
     viz_dir = os.path.join(OUTPUT_DIR, 'visualizations', REPORT_DATE)
     os.makedirs(viz_dir, exist_ok=True)
     
-    # 1. Top 10 Products Bar Chart
-    if results['top_products'] is not None:
-        plt.figure(figsize=(12, 6))
-        df = results['top_products'].head(10)
-        plt.barh(df['product_name'], df['total_quantity_sold'], color='steelblue')
-        plt.xlabel('Total Quantity Sold')
-        plt.title('Top 10 Best-Selling Products', fontsize=14, fontweight='bold')
-        plt.gca().invert_yaxis()
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '1_top_products.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Top Products Chart")
-    
-    # 2. Revenue by Store
-    if results['revenue_by_store'] is not None:
-        plt.figure(figsize=(10, 6))
-        df = results['revenue_by_store']
-        plt.bar(df['store_name'], df['total_revenue'], color='coral')
-        plt.xlabel('Store')
-        plt.ylabel('Total Revenue ($)')
-        plt.title('Revenue by Store', fontsize=14, fontweight='bold')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '2_revenue_by_store.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Revenue by Store Chart")
-    
-    # 3. Revenue by Category Pie Chart
-    if results['revenue_by_category'] is not None:
-        plt.figure(figsize=(10, 8))
-        df = results['revenue_by_category']
-        plt.pie(df['total_revenue'], labels=df['category_name'], autopct='%1.1f%%', startangle=90)
-        plt.title('Revenue Distribution by Category', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '3_revenue_by_category.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Revenue by Category Chart")
-    
-    # 4. Monthly Sales Trend
-    if results['monthly_sales'] is not None:
-        df = results['monthly_sales'].copy()
-        df['year_month'] = df['order_year'].astype(str) + '-' + df['order_month'].astype(str).str.zfill(2)
-        
-        fig, ax1 = plt.subplots(figsize=(14, 6))
-        
-        ax1.plot(df['year_month'], df['total_revenue'], marker='o', color='green', linewidth=2, label='Revenue')
-        ax1.set_xlabel('Month')
-        ax1.set_ylabel('Total Revenue ($)', color='green')
-        ax1.tick_params(axis='y', labelcolor='green')
-        ax1.tick_params(axis='x', rotation=45)
-        
-        ax2 = ax1.twinx()
-        ax2.plot(df['year_month'], df['total_orders'], marker='s', color='blue', linewidth=2, label='Orders')
-        ax2.set_ylabel('Total Orders', color='blue')
-        ax2.tick_params(axis='y', labelcolor='blue')
-        
-        plt.title('Monthly Sales Trend', fontsize=14, fontweight='bold')
-        fig.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '4_monthly_sales_trend.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Monthly Sales Trend Chart")
-    
-    # 5. Staff Performance
-    if results['staff_orders'] is not None:
-        plt.figure(figsize=(12, 6))
-        df = results['staff_orders'].sort_values('total_sales_revenue', ascending=True)
-        plt.barh(df['staff_name'], df['total_sales_revenue'], color='purple')
-        plt.xlabel('Total Sales Revenue ($)')
-        plt.title('Staff Performance by Sales Revenue', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '5_staff_performance.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Staff Performance Chart")
-    
-    # 6. Customer Segmentation
-    if results['customer_spending'] is not None:
-        plt.figure(figsize=(10, 6))
-        df = results['customer_spending']
-        segment_counts = df['customer_segment'].value_counts()
-        colors = ['#ff9999','#66b3ff','#99ff99','#ffcc99']
-        plt.pie(segment_counts, labels=segment_counts.index, autopct='%1.1f%%', colors=colors, startangle=90)
-        plt.title('Customer Segmentation', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '6_customer_segmentation.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Customer Segmentation Chart")
-    
-    # 7. Revenue by Brand
-    if results['revenue_by_brand'] is not None:
-        plt.figure(figsize=(12, 6))
-        df = results['revenue_by_brand'].sort_values('total_revenue', ascending=True)
-        plt.barh(df['brand_name'], df['total_revenue'], color='teal')
-        plt.xlabel('Total Revenue ($)')
-        plt.title('Revenue by Brand', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '7_revenue_by_brand.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Revenue by Brand Chart")
-    
-    # 8. Order Status Distribution
-    if results['order_status_dist'] is not None:
-        plt.figure(figsize=(10, 6))
-        df = results['order_status_dist']
-        plt.bar(df['status_name'], df['order_count'], color='orange')
-        plt.xlabel('Order Status')
-        plt.ylabel('Number of Orders')
-        plt.title('Order Status Distribution', fontsize=14, fontweight='bold')
-        for i, (count, pct) in enumerate(zip(df['order_count'], df['percentage'])):
-            plt.text(i, count, f"{count}\n({pct}%)", ha='center', va='bottom')
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '8_order_status_dist.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Order Status Distribution Chart")
-    
-    # 9. Store Inventory Comparison
-    if results['store_inventory'] is not None:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        df = results['store_inventory']
-        
-        ax1.bar(df['store_name'], df['total_inventory_units'], color='skyblue')
-        ax1.set_xlabel('Store')
-        ax1.set_ylabel('Total Inventory Units')
-        ax1.set_title('Inventory Units by Store')
-        ax1.tick_params(axis='x', rotation=45)
-        
-        ax2.bar(df['store_name'], df['total_inventory_value'], color='lightcoral')
-        ax2.set_xlabel('Store')
-        ax2.set_ylabel('Total Inventory Value ($)')
-        ax2.set_title('Inventory Value by Store')
-        ax2.tick_params(axis='x', rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(viz_dir, '9_store_inventory.png'), dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  ✅ Store Inventory Charts")
+    # Only the columns each chart uses are sent to the workers
+    tasks = []
+    labels = []
+    cached = []
+    used_cache_files = set()
+    for query_name, columns, plot_func, filename, label in CHARTS:
+        if results.get(query_name) is not None:
+            df = results[query_name][columns]
+            out_path = os.path.join(viz_dir, filename)
+            labels.append(label)
+            
+            # Unchanged data: copy the previously rendered chart
+            cache_file = chart_cache_path(plot_func, df) if use_cache else None
+            if cache_file is not None:
+                used_cache_files.add(os.path.basename(cache_file))
+            if cache_file is not None and os.path.exists(cache_file):
+                shutil.copyfile(cache_file, out_path)
+                cached.append(label)
+                continue
+            tasks.append((plot_func, df, out_path, cache_file))
+    
+    # Each chart is independent CPU-bound rasterization, so use processes
+    if tasks:
+        with ProcessPoolExecutor(
+            max_workers=PLOT_WORKERS, mp_context=multiprocessing.get_context(PLOT_START_METHOD)
+        ) as executor:
+            list(executor.map(_dispatch, [task[:3] for task in tasks]))
+    
+    for _, _, out_path, cache_file in tasks:
+        if cache_file is not None:
+            try:
+                shutil.copyfile(out_path, cache_file)
+            except OSError:
+                pass  # Caching is best effort
+    
+    # Charts of data this run no longer has will not be requested again
+    if use_cache:
+        prune_cache_dir(CHART_CACHE_DIR, used_cache_files)
+    
+    for label in labels:
+        source = " (cached)" if label in cached else ""
+        print(f"  ✅ {label}{source}")
     
     print(f"\n📁 Visualizations saved to: {viz_dir}")
     return viz_dir
@@ -481,173 +816,257 @@ def create_visualizations(results):
 # HTML REPORT GENERATION
 # ============================================================================
 
-def generate_html_report(results, viz_dir, csv_dir):
-    """Generate comprehensive HTML report"""
-    print("\n📄 Generating HTML Report...")
-    
-    html_dir = os.path.join(OUTPUT_DIR, 'html')
-    os.makedirs(html_dir, exist_ok=True)
-    
-    html_file = os.path.join(html_dir, f'retail_analysis_report_{REPORT_DATE}.html')
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Retail Analysis Report - {REPORT_DATE}</title>
-        <style>
-            body {{
+# Report stylesheet: a plain constant, so its braces need no f-string escaping
+REPORT_CSS = """
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 margin: 0;
                 padding: 20px;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: #333;
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1200px;
                 margin: 0 auto;
                 background: white;
                 padding: 40px;
                 border-radius: 10px;
                 box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-            }}
-            h1 {{
+            }
+            h1 {
                 color: #667eea;
                 text-align: center;
                 font-size: 2.5em;
                 margin-bottom: 10px;
-            }}
-            .subtitle {{
+            }
+            .subtitle {
                 text-align: center;
                 color: #666;
                 margin-bottom: 30px;
                 font-size: 1.1em;
-            }}
-            h2 {{
+            }
+            h2 {
                 color: #764ba2;
                 border-bottom: 3px solid #667eea;
                 padding-bottom: 10px;
                 margin-top: 40px;
-            }}
-            .metric-grid {{
+            }
+            .metric-grid {
                 display: grid;
                 grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
                 gap: 20px;
                 margin: 20px 0;
-            }}
-            .metric-card {{
+            }
+            .metric-card {
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: white;
                 padding: 20px;
                 border-radius: 8px;
                 box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }}
-            .metric-value {{
+            }
+            .metric-value {
                 font-size: 2em;
                 font-weight: bold;
                 margin: 10px 0;
-            }}
-            .metric-label {{
+            }
+            .metric-label {
                 font-size: 0.9em;
                 opacity: 0.9;
-            }}
-            table {{
+            }
+            table {
                 width: 100%;
                 border-collapse: collapse;
                 margin: 20px 0;
                 box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            th {{
+            }
+            th {
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: white;
                 padding: 12px;
                 text-align: left;
-            }}
-            td {{
+            }
+            td {
                 padding: 10px;
                 border-bottom: 1px solid #ddd;
-            }}
-            tr:hover {{
+            }
+            tr:hover {
                 background-color: #f5f5f5;
-            }}
-            .chart-container {{
+            }
+            .chart-container {
                 margin: 30px 0;
                 text-align: center;
-            }}
-            .chart-container img {{
+            }
+            .chart-container img {
                 max-width: 100%;
                 height: auto;
                 border-radius: 8px;
                 box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            }}
-            .footer {{
+            }
+            .footer {
                 text-align: center;
                 margin-top: 50px;
                 padding-top: 20px;
                 border-top: 2px solid #eee;
                 color: #666;
-            }}
-            .status-badge {{
+            }
+            .status-badge {
                 padding: 5px 10px;
                 border-radius: 20px;
                 font-size: 0.85em;
                 font-weight: bold;
-            }}
-            .high-spender {{ background: #4caf50; color: white; }}
-            .medium-spender {{ background: #ff9800; color: white; }}
-            .low-spender {{ background: #f44336; color: white; }}
-            .no-orders {{ background: #9e9e9e; color: white; }}
-        </style>
+            }
+            .high-spender { background: #4caf50; color: white; }
+            .medium-spender { background: #ff9800; color: white; }
+            .low-spender { background: #f44336; color: white; }
+            .no-orders { background: #9e9e9e; color: white; }
+        """
+
+# Page chrome around the report sections, parsed once at import
+REPORT_HEADER = Template("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Retail Analysis Report - $report_date</title>
+        <style>$css</style>
     </head>
     <body>
         <div class="container">
             <h1>🏪 Retail Store Analysis Report</h1>
             <div class="subtitle">
-                Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}<br>
-                Database: {SQL_DATABASE} | Server: {SQL_SERVER}
+                Generated on $generated_at<br>
+                Database: $database | Server: $server
             </div>
-    """
+    """)
+
+REPORT_FOOTER = Template("""
+            <div class="footer">
+                <p><strong>Report Information</strong></p>
+                <p>CSV Files: $csv_dir</p>
+                <p>Visualizations: $viz_dir</p>
+                <p>© 2024 Retail Database Analysis System</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """)
+
+
+@lru_cache(maxsize=None)
+def _png_size(path):
+    """Pixel (width, height) of a PNG, or None if it was not written"""
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except OSError:
+        return None
+
+
+def _html_text(values):
+    """Cell text for a column of names, HTML-escaped"""
+    return values.map(lambda value: html.escape(str(value)))
+
+
+def _html_rows(cells, row_tag='<tr>'):
+    """Table rows for columns of cell text, concatenated column-wise"""
+    rows = "\n                " + row_tag
+    for cell in cells:
+        rows = rows + "\n                    <td>" + cell + "</td>"
+    rows = rows + "\n                </tr>\n            "
+    return rows.str.cat()
+
+
+def _chart_img(viz_dir, filename, alt):
+    """<img> tag for a chart, lazy-loaded and sized from the PNG itself"""
+    size = _png_size(os.path.join(viz_dir, filename))
+    dims = f' width="{size[0]}" height="{size[1]}"' if size else ''
+    return (
+        f'<img src="../visualizations/{REPORT_DATE}/{filename}" alt="{alt}" '
+        f'loading="lazy" decoding="async"{dims}>'
+    )
+
+
+def _report_metrics(results):
+    """Scalar figures shown in the report, as plain Python numbers and strings"""
+    metrics = {}
+    stores = results['revenue_by_store']
+    counts = results['customer_segment_counts']
+    best = results['best_staff']
+    low_stock = results['low_stock_products']
+    
+    if counts is not None:
+        segments = counts['customer_segment'].to_numpy()
+        customers = counts['customer_count'].to_numpy()
+        metrics['total_customers'] = customers.sum().item()
+        metrics['inactive_customers'] = customers[segments == 'No Orders'].sum().item()
+    
+    if stores is not None:
+        total_revenue = stores['total_revenue'].to_numpy().sum().item()
+        total_orders = stores['total_orders'].to_numpy().sum().item()
+        metrics['total_revenue'] = total_revenue
+        metrics['total_orders'] = total_orders
+        metrics['avg_order_value'] = total_revenue / total_orders if total_orders > 0 else 0
+    
+    if best is not None and not best.empty:
+        for key, column in [('best_staff_name', 'staff_name'),
+                            ('best_staff_store', 'store_name'),
+                            ('best_staff_revenue', 'total_sales_revenue'),
+                            ('best_staff_orders', 'total_orders_handled')]:
+            value = best.iat[0, best.columns.get_loc(column)]
+            metrics[key] = value.item() if hasattr(value, 'item') else html.escape(str(value))
+    
+    if low_stock is not None and not low_stock.empty:
+        metrics['low_stock_count'] = len(low_stock)
+    
+    return metrics
+
+
+def _html_sections(results, viz_dir, csv_dir):
+    """Yield the HTML report section by section"""
+    m = _report_metrics(results)
+    
+    yield REPORT_HEADER.substitute(
+        report_date=REPORT_DATE,
+        css=REPORT_CSS,
+        generated_at=datetime.now().strftime('%B %d, %Y at %H:%M:%S'),
+        database=SQL_DATABASE,
+        server=SQL_SERVER,
+    )
     
     # Key Metrics Section
-    if results['revenue_by_store'] is not None and results['customer_spending'] is not None:
-        total_revenue = results['revenue_by_store']['total_revenue'].sum()
-        total_orders = results['revenue_by_store']['total_orders'].sum()
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-        total_customers = len(results['customer_spending'])
-        
-        html_content += f"""
+    if 'total_revenue' in m and 'total_customers' in m:
+        yield f"""
             <h2>📊 Key Business Metrics</h2>
             <div class="metric-grid">
                 <div class="metric-card">
                     <div class="metric-label">Total Revenue</div>
-                    <div class="metric-value">${total_revenue:,.2f}</div>
+                    <div class="metric-value">${m['total_revenue']:,.2f}</div>
                 </div>
                 <div class="metric-card">
                     <div class="metric-label">Total Orders</div>
-                    <div class="metric-value">{total_orders:,}</div>
+                    <div class="metric-value">{m['total_orders']:,}</div>
                 </div>
                 <div class="metric-card">
                     <div class="metric-label">Average Order Value</div>
-                    <div class="metric-value">${avg_order_value:,.2f}</div>
+                    <div class="metric-value">${m['avg_order_value']:,.2f}</div>
                 </div>
                 <div class="metric-card">
                     <div class="metric-label">Total Customers</div>
-                    <div class="metric-value">{total_customers:,}</div>
+                    <div class="metric-value">{m['total_customers']:,}</div>
                 </div>
             </div>
         """
     
     # Sales Analysis
-    html_content += "<h2>💰 Sales Analysis</h2>"
+    yield "<h2>💰 Sales Analysis</h2>"
     
     # Top Products
     if results['top_products'] is not None:
-        html_content += """
+        yield """
             <h3>Top 10 Best-Selling Products</h3>
             <div class="chart-container">
-                <img src="../visualizations/{}/1_top_products.png" alt="Top Products">
+                {}
             </div>
             <table>
                 <thead>
@@ -660,93 +1079,89 @@ def generate_html_report(results, viz_dir, csv_dir):
                     </tr>
                 </thead>
                 <tbody>
-        """.format(REPORT_DATE)
+        """.format(_chart_img(viz_dir, '1_top_products.png', 'Top Products'))
         
-        for _, row in results['top_products'].head(10).iterrows():
-            html_content += f"""
-                <tr>
-                    <td>{row['product_name']}</td>
-                    <td>{row['brand_name']}</td>
-                    <td>{row['category_name']}</td>
-                    <td>{row['total_quantity_sold']:,}</td>
-                    <td>${row['total_revenue']:,.2f}</td>
-                </tr>
-            """
-        html_content += "</tbody></table>"
+        top = results['top_products'].head(10)
+        yield _html_rows([
+            _html_text(top['product_name']),
+            _html_text(top['brand_name']),
+            _html_text(top['category_name']),
+            top['total_quantity_sold'].map('{:,}'.format),
+            top['total_revenue'].map('${:,.2f}'.format),
+        ])
+        yield "</tbody></table>"
     
     # Revenue Charts
-    html_content += f"""
+    yield f"""
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/2_revenue_by_store.png" alt="Revenue by Store">
+            {_chart_img(viz_dir, '2_revenue_by_store.png', 'Revenue by Store')}
         </div>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/3_revenue_by_category.png" alt="Revenue by Category">
+            {_chart_img(viz_dir, '3_revenue_by_category.png', 'Revenue by Category')}
         </div>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/4_monthly_sales_trend.png" alt="Monthly Sales Trend">
+            {_chart_img(viz_dir, '4_monthly_sales_trend.png', 'Monthly Sales Trend')}
         </div>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/7_revenue_by_brand.png" alt="Revenue by Brand">
+            {_chart_img(viz_dir, '7_revenue_by_brand.png', 'Revenue by Brand')}
         </div>
     """
     
     # Staff Performance
-    html_content += f"""
+    yield f"""
         <h2>👥 Staff Performance</h2>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/5_staff_performance.png" alt="Staff Performance">
+            {_chart_img(viz_dir, '5_staff_performance.png', 'Staff Performance')}
         </div>
     """
     
-    if results['best_staff'] is not None and not results['best_staff'].empty:
-        best = results['best_staff'].iloc[0]
-        html_content += f"""
+    if 'best_staff_name' in m:
+        yield f"""
             <div class="metric-grid">
                 <div class="metric-card">
                     <div class="metric-label">Best Performing Staff</div>
-                    <div class="metric-value" style="font-size: 1.5em;">{best['staff_name']}</div>
-                    <div class="metric-label">{best['store_name']}</div>
+                    <div class="metric-value" style="font-size: 1.5em;">{m['best_staff_name']}</div>
+                    <div class="metric-label">{m['best_staff_store']}</div>
                 </div>
                 <div class="metric-card">
                     <div class="metric-label">Total Sales</div>
-                    <div class="metric-value">${best['total_sales_revenue']:,.2f}</div>
+                    <div class="metric-value">${m['best_staff_revenue']:,.2f}</div>
                 </div>
                 <div class="metric-card">
                     <div class="metric-label">Orders Handled</div>
-                    <div class="metric-value">{best['total_orders_handled']:,}</div>
+                    <div class="metric-value">{m['best_staff_orders']:,}</div>
                 </div>
             </div>
         """
     
     # Customer Insights
-    html_content += f"""
+    yield f"""
         <h2>👤 Customer Insights</h2>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/6_customer_segmentation.png" alt="Customer Segmentation">
+            {_chart_img(viz_dir, '6_customer_segmentation.png', 'Customer Segmentation')}
         </div>
     """
     
-    if results['customers_no_orders'] is not None:
-        inactive_count = len(results['customers_no_orders'])
-        html_content += f"""
+    if 'inactive_customers' in m:
+        yield f"""
             <div class="metric-card" style="margin: 20px 0;">
                 <div class="metric-label">⚠️ Customers with No Orders</div>
-                <div class="metric-value">{inactive_count:,}</div>
+                <div class="metric-value">{m['inactive_customers']:,}</div>
                 <div class="metric-label">Potential for re-engagement campaigns</div>
             </div>
         """
     
     # Inventory Analysis
-    html_content += f"""
+    yield f"""
         <h2>📦 Inventory Analysis</h2>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/9_store_inventory.png" alt="Store Inventory">
+            {_chart_img(viz_dir, '9_store_inventory.png', 'Store Inventory')}
         </div>
     """
     
-    if results['low_stock_products'] is not None and not results['low_stock_products'].empty:
-        html_content += f"""
-            <h3>⚠️ Low Stock Alert ({len(results['low_stock_products'])} products)</h3>
+    if 'low_stock_count' in m:
+        yield f"""
+            <h3>⚠️ Low Stock Alert ({m['low_stock_count']} products)</h3>
             <table>
                 <thead>
                     <tr>
@@ -759,42 +1174,40 @@ def generate_html_report(results, viz_dir, csv_dir):
                 </thead>
                 <tbody>
         """
-        for _, row in results['low_stock_products'].head(10).iterrows():
-            stock = row['total_stock'] if pd.notna(row['total_stock']) else 0
-            html_content += f"""
-                <tr style="background-color: #fff3cd;">
-                    <td>{row['product_name']}</td>
-                    <td>{row['brand_name']}</td>
-                    <td>{row['category_name']}</td>
-                    <td>{int(stock)}</td>
-                    <td>${row['list_price']:,.2f}</td>
-                </tr>
-            """
-        html_content += "</tbody></table>"
+        low_stock = results['low_stock_products'].head(10)
+        yield _html_rows([
+            _html_text(low_stock['product_name']),
+            _html_text(low_stock['brand_name']),
+            _html_text(low_stock['category_name']),
+            low_stock['total_stock'].fillna(0).astype('int32').astype(str),
+            low_stock['list_price'].map('${:,.2f}'.format),
+        ], row_tag='<tr style="background-color: #fff3cd;">')
+        yield "</tbody></table>"
     
     # Order Status
-    html_content += f"""
+    yield f"""
         <h2>📋 Order Status</h2>
         <div class="chart-container">
-            <img src="../visualizations/{REPORT_DATE}/8_order_status_dist.png" alt="Order Status Distribution">
+            {_chart_img(viz_dir, '8_order_status_dist.png', 'Order Status Distribution')}
         </div>
     """
     
     # Footer
-    html_content += f"""
-            <div class="footer">
-                <p><strong>Report Information</strong></p>
-                <p>CSV Files: {csv_dir}</p>
-                <p>Visualizations: {viz_dir}</p>
-                <p>© 2024 Retail Database Analysis System</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    yield REPORT_FOOTER.substitute(csv_dir=csv_dir, viz_dir=viz_dir)
+
+
+def generate_html_report(results, viz_dir, csv_dir):
+    """Generate comprehensive HTML report"""
+    print("\n📄 Generating HTML Report...")
     
+    html_dir = os.path.join(OUTPUT_DIR, 'html')
+    os.makedirs(html_dir, exist_ok=True)
+    
+    html_file = os.path.join(html_dir, f'retail_analysis_report_{REPORT_DATE}.html')
+    
+    # Each section goes to disk as it is built; the page is never held whole
     with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        f.writelines(_html_sections(results, viz_dir, csv_dir))
     
     print(f"  ✅ HTML report saved to: {html_file}")
     return html_file
@@ -814,14 +1227,16 @@ def main():
         print("\n❌ Cannot proceed without database connection")
         return False
     
-    # Step 2: Execute queries
-    results = execute_queries(engine)
-    
-    # Step 3: Save CSV reports
-    csv_dir = save_csv_reports(results)
+    # Step 2: Execute queries (--no-cache forces a fresh run)
+    use_cache = '--no-cache' not in sys.argv
+    results = execute_queries(engine, USE_QUERY_CACHE and use_cache)
     
-    # Step 4: Create visualizations
-    viz_dir = create_visualizations(results)
+    # Steps 3-4: CSV reports are written on a thread while the chart
+    # workers render; only the HTML report needs both
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        csv_future = executor.submit(save_csv_reports, results)
+        viz_dir = create_visualizations(results, USE_CHART_CACHE and use_cache)
+        csv_dir = csv_future.result()
     
     # Step 5: Generate HTML report
     html_file = generate_html_report(results, viz_dir, csv_dir)
@@ -6,19 +6,61 @@ Returns a configuration that triggers only necessary transformations
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import yaml
 from datetime import datetime
 import warnings
 import sys
 import os
+import hashlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 
 # Ensure src module can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from src.utils.config_loader import get_raw_data_dir, get_config_path
+from src.utils.config_loader import get_raw_data_dir, get_config_path, get_cache_dir
 
 warnings.filterwarnings("ignore")
 
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Rows parsed per chunk when streaming source files
+CHUNK_SIZE = 500_000
+
+# Bytes per block for the multi-threaded Arrow CSV reader
+BLOCK_SIZE = 8 << 20
+
+# Reuse check results for source files unchanged since the last run
+USE_CACHE = True
+
+# Bump when the way files are read or checked changes, to invalidate old entries
+CACHE_VERSION = 7
+
+# Columns read as Arrow-backed strings so .str checks skip object conversion
+STRING_COLUMNS = {"customers": ["phone"]}
+
+# Stats gathered per column during the column sweep (see RANGE_TESTS)
+STATS_COLUMNS = {
+    "products": {"list_price": ["negative"]},
+    "order_items": {"quantity": ["negative", "zero"], "discount": ["outside_unit"]},
+    "customers": {"phone": ["multiple"]},
+}
+
+# Elements per block when counting range stats, so the masks stay in cache
+STATS_BLOCK = 1 << 16
+
+# Worker processes used to check source files in parallel
+MAX_WORKERS = os.cpu_count() or 1
+
+# "full" checks every dataset; "decision" (--fast) stops scanning data once
+# cleaning is known to be needed and only reads headers for the rest
+CHECK_MODE = "full"
+
 # ============================================================================
 # CHECK FUNCTIONS
 # ============================================================================
@@ -26,30 +68,33 @@ warnings.filterwarnings("ignore")
 
 def check_column_standardization(df):
     """Check if columns need standardization (lowercase, underscores)"""
-    needs_standardization = False
-    issues = []
+    cols = df.columns.astype(str).to_series()
+    has_upper = cols != cols.str.lower()
+    has_space = cols.str.contains(" ", regex=False)
+    bad = has_upper | has_space
 
-    for col in df.columns:
-        # Check for uppercase
-        if col != col.lower():
-            needs_standardization = True
+    # Only the flagged columns are formatted into messages
+    issues = []
+    for col, upper, space in zip(cols[bad], has_upper[bad], has_space[bad]):
+        if upper:
             issues.append(f"Uppercase: '{col}'")
-
-        # Check for spaces
-        if " " in col:
-            needs_standardization = True
+        if space:
             issues.append(f"Spaces: '{col}'")
 
     return {
-        "needed": needs_standardization,
+        "needed": bool(bad.any()),
         "issues": issues[:5],  # Limit to 5 examples
     }
 
 
-def check_duplicates(df):
-    """Check for duplicate rows"""
-    dup_count = df.duplicated().sum()
-    dup_pct = (dup_count / len(df) * 100) if len(df) > 0 else 0
+def distinct_row_hashes(df):
+    """Return the distinct 64-bit row hashes of a DataFrame (one hash pass)"""
+    return pd.unique(pd.util.hash_pandas_object(df, index=False).to_numpy())
+
+
+def summarize_duplicates(dup_count, row_count):
+    """Build the duplicates check result from a duplicate row count"""
+    dup_pct = (dup_count / row_count * 100) if row_count > 0 else 0
 
     return {
         "needed": dup_count > 0,
@@ -58,109 +103,204 @@ def check_duplicates(df):
     }
 
 
-def check_missing_values(df, table_name):
-    """Check for missing values that need handling"""
-    missing_info = {}
-    needs_handling = False
+def check_duplicates(df):
+    """Check for duplicate rows"""
+    dup_count = len(df) - len(distinct_row_hashes(df))
+    return summarize_duplicates(dup_count, len(df))
 
-    for col in df.columns:
-        missing_count = df[col].isnull().sum()
-        if missing_count > 0:
-            needs_handling = True
-            missing_pct = missing_count / len(df) * 100
-            missing_info[col] = {
-                "count": int(missing_count),
-                "percentage": round(missing_pct, 2),
-            }
 
-    return {"needed": needs_handling, "columns": missing_info}
+def summarize_missing(null_counts, row_count):
+    """Build the missing values check result from per-column null counts"""
+    missing = null_counts[null_counts > 0]
+    missing_info = {
+        col: {
+            "count": int(count),
+            "percentage": round(count / row_count * 100, 2),
+        }
+        for col, count in missing.items()
+    }
+
+    return {"needed": bool(missing_info), "columns": missing_info}
+
+
+def check_missing_values(df, table_name):
+    """Check for missing values that need handling"""
+    null_counts, _ = analyze_columns(df, table_name)
+    return summarize_missing(null_counts, len(df))
 
 
 def check_data_types(df, table_name):
     """Check if data types need conversion"""
-    type_issues = {}
-    needs_conversion = False
+    dtypes = df.dtypes.astype(str)
+    names = df.columns.astype(str).str.lower().to_series(index=df.columns)
+
+    # Name rules are checked in priority order: id, then price, then date
+    is_id = names.str.endswith("id")
+    is_price = ~is_id & names.str.contains("price", regex=False)
+    is_date = ~is_id & ~is_price & names.str.contains("date", regex=False)
+
+    expected = pd.Series("", index=df.columns)
+    expected[is_id & ~dtypes.isin(["int64", "int32"])] = "int"
+    expected[is_price & ~dtypes.isin(["float64", "float32", "int64", "int32"])] = "float"
+    expected[is_date & ~dtypes.str.startswith("datetime")] = "datetime"
+
+    # Only the flagged columns are turned into issue entries
+    flagged = expected[expected != ""]
+    type_issues = {
+        col: {"current": str(dtypes[col]), "expected": str(exp)}
+        for col, exp in flagged.items()
+    }
 
-    for col in df.columns:
-        col_lower = col.lower()
-        current_type = str(df[col].dtype)
-        expected_type = None
+    return {"needed": bool(type_issues), "issues": type_issues}
+
+
+RANGE_TESTS = {
+    "negative": lambda v: v < 0,
+    "zero": lambda v: v == 0,
+    "outside_unit": lambda v: (v < 0) | (v > 1),
+}
+
+
+def column_stats(series, names):
+    """Count out-of-range (numeric) or comma-separated (text) values in a column"""
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy()
+        counts = dict.fromkeys(names, 0)
+        # All tests run block by block, so the column is read from memory once
+        for start in range(0, len(values), STATS_BLOCK):
+            block = values[start:start + STATS_BLOCK]
+            for name in names:
+                counts[name] += int(np.count_nonzero(RANGE_TESTS[name](block)))
+        return counts
+
+    # Arrow-backed strings hand their buffers to pyarrow.compute without a copy
+    if getattr(series.dtype, "storage", None) != "pyarrow":
+        series = series.astype("string[pyarrow]")
+    values = pa.array(series.array)
+    return {"multiple": count_true(pc.match_substring(values, ","))}
+
+
+def table_column_stats(df, table_name):
+    """Collect column stats for the table's STATS_COLUMNS present in df"""
+    return {
+        col: column_stats(df[col], names)
+        for col, names in STATS_COLUMNS.get(table_name, {}).items()
+        if col in df.columns
+    }
 
-        # ID columns should be int
-        if col_lower.endswith("id"):
-            if current_type not in ["int64", "int32"]:
-                expected_type = "int"
-                needs_conversion = True
 
-        # Price columns should be numeric
-        elif "price" in col_lower:
-            if current_type not in ["float64", "float32", "int64", "int32"]:
-                expected_type = "float"
-                needs_conversion = True
+ARROW_RANGE_TESTS = {
+    "negative": lambda a: pc.less(a, 0),
+    "zero": lambda a: pc.equal(a, 0),
+    "outside_unit": lambda a: pc.or_(pc.less(a, 0), pc.greater(a, 1)),
+}
 
-        # Date columns should be datetime
-        elif "date" in col_lower:
-            if not current_type.startswith("datetime"):
-                expected_type = "datetime"
-                needs_conversion = True
 
-        if expected_type:
-            type_issues[col] = {"current": current_type, "expected": expected_type}
+def count_true(mask):
+    """Count the true values of an Arrow boolean array (nulls count as false)"""
+    return int(pc.sum(mask).as_py() or 0)
 
-    return {"needed": needs_conversion, "issues": type_issues}
 
+def analyze_batch(batch, table_name):
+    """Arrow counterpart of analyze_columns, run before converting to pandas"""
+    # Null counts come straight from the validity bitmaps
+    null_counts = pd.Series(
+        [column.null_count for column in batch.columns],
+        index=batch.schema.names,
+        dtype="int64",
+    )
 
-def check_products_quality(df):
+    stats = {}
+    for col, names in STATS_COLUMNS.get(table_name, {}).items():
+        if col not in batch.schema.names:
+            continue
+        values = batch.column(col)
+        if pa.types.is_integer(values.type) or pa.types.is_floating(values.type):
+            stats[col] = {
+                name: count_true(ARROW_RANGE_TESTS[name](values)) for name in names
+            }
+        else:
+            if not pa.types.is_string(values.type):
+                values = values.cast(pa.string())
+            stats[col] = {"multiple": count_true(pc.match_substring(values, ","))}
+
+    return null_counts, stats
+
+
+def analyze_columns(df, table_name):
+    """Sweep each column once, returning (null_counts, column_stats)"""
+    stats_columns = STATS_COLUMNS.get(table_name, {})
+    null_counts = []
+    stats = {}
+
+    for col in df.columns:
+        series = df[col]
+        if series.dtype.kind == "f":
+            null_counts.append(np.count_nonzero(np.isnan(series.to_numpy())))
+        else:
+            null_counts.append(int(series.isna().sum()))
+
+        # Range and format stats reuse the column while it is in cache
+        if col in stats_columns:
+            stats[col] = column_stats(series, stats_columns[col])
+
+    return pd.Series(null_counts, index=df.columns, dtype="int64"), stats
+
+
+def check_products_quality(df, stats=None):
     """Check product-specific data quality issues"""
+    if stats is None:
+        stats = table_column_stats(df, "products")
     issues = {}
     needs_cleaning = False
 
-    if "list_price" in df.columns:
-        neg_prices = (df["list_price"] < 0).sum()
+    if "list_price" in stats:
+        neg_prices = stats["list_price"]["negative"]
         if neg_prices > 0:
             needs_cleaning = True
-            issues["negative_prices"] = int(neg_prices)
+            issues["negative_prices"] = neg_prices
 
     return {"needed": needs_cleaning, "issues": issues}
 
 
-def check_order_items_quality(df):
+def check_order_items_quality(df, stats=None):
     """Check order_items-specific data quality issues"""
+    if stats is None:
+        stats = table_column_stats(df, "order_items")
     issues = {}
     needs_cleaning = False
 
-    if "quantity" in df.columns:
-        neg_qty = (df["quantity"] < 0).sum()
-        zero_qty = (df["quantity"] == 0).sum()
+    if "quantity" in stats:
+        neg_qty = stats["quantity"]["negative"]
+        zero_qty = stats["quantity"]["zero"]
         if neg_qty > 0 or zero_qty > 0:
             needs_cleaning = True
             issues["invalid_quantities"] = {
-                "negative": int(neg_qty),
-                "zero": int(zero_qty),
+                "negative": neg_qty,
+                "zero": zero_qty,
             }
 
-    if "discount" in df.columns:
-        invalid_disc = ((df["discount"] < 0) | (df["discount"] > 1)).sum()
+    if "discount" in stats:
+        invalid_disc = stats["discount"]["outside_unit"]
         if invalid_disc > 0:
             needs_cleaning = True
-            issues["invalid_discounts"] = int(invalid_disc)
+            issues["invalid_discounts"] = invalid_disc
 
     return {"needed": needs_cleaning, "issues": issues}
 
 
-def check_customers_quality(df):
+def check_customers_quality(df, stats=None):
     """Check customer-specific data quality issues"""
+    if stats is None:
+        stats = table_column_stats(df, "customers")
     issues = {}
     needs_cleaning = False
 
-    if "phone" in df.columns:
-        non_null_phones = df["phone"].dropna()
-        multi_phones = non_null_phones[
-            non_null_phones.astype(str).str.contains(",", na=False)
-        ]
-        if len(multi_phones) > 0:
+    if "phone" in stats:
+        multi_phones = stats["phone"]["multiple"]
+        if multi_phones > 0:
             needs_cleaning = True
-            issues["multiple_phones"] = int(len(multi_phones))
+            issues["multiple_phones"] = multi_phones
 
     # Check if full_name column exists
     if (
@@ -174,15 +314,18 @@ def check_customers_quality(df):
     return {"needed": needs_cleaning, "issues": issues}
 
 
-def check_transformations_needed(dfs):
-    """Check if transformations like merges and calculations are needed"""
+def check_transformations_needed(schemas):
+    """Check if transformations are needed, given {table: column set}"""
     transformations = {}
 
+    # Plain column lists are accepted too
+    col_sets = {name: frozenset(columns) for name, columns in schemas.items()}
+
     # Check if products need brand/category names
-    if "products" in dfs:
-        products = dfs["products"]
-        has_brand_name = "brand_name" in products.columns
-        has_category_name = "category_name" in products.columns
+    if "products" in col_sets:
+        products_cols = col_sets["products"]
+        has_brand_name = "brand_name" in products_cols
+        has_category_name = "category_name" in products_cols
 
         transformations["enrich_products"] = {
             "needed": not (has_brand_name and has_category_name),
@@ -197,28 +340,327 @@ def check_transformations_needed(dfs):
             )
 
     # Check if order_items need total_price calculation
-    if "order_items" in dfs:
-        order_items = dfs["order_items"]
+    if "order_items" in col_sets:
         transformations["calculate_item_total"] = {
-            "needed": "total_price" not in order_items.columns
+            "needed": "total_price" not in col_sets["order_items"]
         }
 
     # Check if orders need order_total calculation
-    if "orders" in dfs:
-        orders = dfs["orders"]
+    if "orders" in col_sets:
         transformations["calculate_order_total"] = {
-            "needed": "order_total" not in orders.columns
+            "needed": "order_total" not in col_sets["orders"]
         }
 
     return transformations
 
 
+# Table-specific quality checks
+QUALITY_CHECKS = {
+    "products": check_products_quality,
+    "order_items": check_order_items_quality,
+    "customers": check_customers_quality,
+}
+
+
+# ============================================================================
+# STREAMING ACCUMULATION
+# ============================================================================
+
+
+def iter_chunks(file_path, encoding="utf-8", chunksize=CHUNK_SIZE, string_columns=()):
+    """Yield (DataFrame chunk, None) pairs of at most `chunksize` rows"""
+    dtype = {name: "string[pyarrow]" for name in string_columns}
+    with pd.read_csv(
+        file_path, encoding=encoding, chunksize=chunksize, dtype=dtype
+    ) as reader:
+        for chunk in reader:
+            yield chunk, None
+
+
+def batch_to_frame(batch, string_columns=()):
+    """Convert an Arrow batch to pandas, leaving `string_columns` Arrow-backed"""
+    names = [name for name in batch.schema.names if name in string_columns]
+    frame = batch.drop_columns(names).to_pandas()
+    for name in names:
+        frame.insert(
+            batch.schema.get_field_index(name),
+            name,
+            pd.arrays.ArrowStringArray(batch.column(name)),
+        )
+    return frame
+
+
+def iter_arrow_chunks(
+    file_path, block_size=BLOCK_SIZE, string_columns=(), table_name=None
+):
+    """Yield (DataFrame chunk, Arrow column summary) pairs from Arrow's reader"""
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=block_size),
+        # Keep dates as text and empty fields as nulls, like pd.read_csv
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in string_columns},
+            timestamp_parsers=[],
+            strings_can_be_null=True,
+        ),
+    )
+
+    # Arrow falls back to binary columns for bytes that are not valid UTF-8
+    if any(pa.types.is_binary(field.type) for field in reader.schema):
+        raise pa.ArrowInvalid(f"{file_path} is not valid UTF-8")
+
+    empty = True
+    for batch in reader:
+        empty = False
+        yield batch_to_frame(batch, string_columns), analyze_batch(batch, table_name)
+
+    if empty:
+        batch = pa.RecordBatch.from_pylist([], schema=reader.schema)
+        yield batch_to_frame(batch, string_columns), analyze_batch(batch, table_name)
+
+
+def new_accumulator():
+    """Create an empty running state for one dataset"""
+    return {
+        "row_count": 0,
+        "schema": None,
+        "null_counts": None,
+        "distinct_rows": np.empty(0, dtype=np.uint64),
+        "quality_issues": {},
+        "partial": False,
+    }
+
+
+def merge_issue_counts(total, part):
+    """Combine issue counters from two chunks (counts add up, flags stay set)"""
+    merged = dict(total)
+    for key, value in part.items():
+        if isinstance(value, dict):
+            merged[key] = merge_issue_counts(merged.get(key, {}), value)
+        elif isinstance(value, bool):
+            merged[key] = merged.get(key, False) or value
+        else:
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def update_accumulator(acc, chunk, table_name, summary=None):
+    """Fold one chunk (and its precomputed column summary, if any) into acc"""
+    # Column names and dtypes are taken from the first chunk only
+    if acc["schema"] is None:
+        acc["schema"] = chunk.head(0)
+
+    acc["row_count"] += len(chunk)
+
+    if summary is None:
+        summary = analyze_columns(chunk, table_name)
+    null_counts, stats = summary
+    if acc["null_counts"] is None:
+        acc["null_counts"] = null_counts
+    else:
+        acc["null_counts"] = acc["null_counts"].add(null_counts, fill_value=0)
+
+    # Keep only distinct row hashes; duplicates = rows - distinct rows
+    acc["distinct_rows"] = pd.unique(
+        np.concatenate([acc["distinct_rows"], distinct_row_hashes(chunk)])
+    )
+
+    if table_name in QUALITY_CHECKS:
+        issues = QUALITY_CHECKS[table_name](chunk, stats)["issues"]
+        acc["quality_issues"] = merge_issue_counts(acc["quality_issues"], issues)
+
+
+def accumulate_chunks(chunks, table_name, stop=None):
+    """Fold (chunk, summary) pairs into a fresh accumulator until stop(acc)"""
+    acc = new_accumulator()
+    for chunk, summary in chunks:
+        # Checked before each further chunk, so "partial" means rows were left
+        if stop is not None and acc["schema"] is not None and stop(acc):
+            acc["partial"] = True
+            break
+        update_accumulator(acc, chunk, table_name, summary)
+    return acc
+
+
+def scan_dataset(
+    file_path, table_name, chunksize=CHUNK_SIZE, block_size=BLOCK_SIZE, stop=None
+):
+    """Stream a CSV file and accumulate its checks, returning (acc, encoding)"""
+    # Arrow parses UTF-8 files; pandas handles anything Arrow rejects
+    string_columns = STRING_COLUMNS.get(table_name, ())
+
+    try:
+        chunks = iter_arrow_chunks(file_path, block_size, string_columns, table_name)
+        return accumulate_chunks(chunks, table_name, stop), "utf-8"
+    except pa.ArrowInvalid:
+        pass
+
+    try:
+        chunks = iter_chunks(file_path, "utf-8", chunksize, string_columns)
+        return accumulate_chunks(chunks, table_name, stop), "utf-8"
+    except UnicodeDecodeError:
+        chunks = iter_chunks(file_path, "latin-1", chunksize, string_columns)
+        return accumulate_chunks(chunks, table_name, stop), "latin-1"
+
+
+def finalize_dataset(acc, table_name):
+    """Turn a dataset accumulator into its configuration entry"""
+    schema = acc["schema"]
+    row_count = acc["row_count"]
+
+    dup_count = row_count - len(acc["distinct_rows"])
+
+    dataset_config = {
+        "row_count": row_count,
+        "column_count": len(schema.columns),
+        "checks": {
+            "column_standardization": check_column_standardization(schema),
+            "duplicates": summarize_duplicates(dup_count, row_count),
+            "missing_values": summarize_missing(acc["null_counts"], row_count),
+            "data_types": check_data_types(schema, table_name),
+        },
+    }
+
+    if table_name in QUALITY_CHECKS:
+        issues = acc["quality_issues"]
+        dataset_config["checks"]["quality"] = {
+            "needed": bool(issues),
+            "issues": issues,
+        }
+
+    return dataset_config
+
+
+def check_dataset(file_path, table_name, stop=None):
+    """Scan one source file and return its checks, schema and encoding"""
+    acc, encoding = scan_dataset(file_path, table_name, stop=stop)
+    return {
+        "dataset": finalize_dataset(acc, table_name),
+        "schema": acc["schema"],
+        "encoding": encoding,
+        "partial": acc["partial"],
+    }
+
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+
+def get_cache_file(file_path, table_name):
+    """Cache entry location, keyed on the file's path, mtime and size"""
+    stat = os.stat(file_path)
+    key = f"{CACHE_VERSION}:{file_path}:{stat.st_mtime}:{stat.st_size}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return get_cache_dir() / "quality_check" / f"{table_name}_{digest}.pkl"
+
+
+def is_valid_cache_entry(entry, file_path):
+    """Reject entries that are malformed or whose columns no longer match"""
+    if not isinstance(entry, dict) or not {"dataset", "schema", "encoding"} <= entry.keys():
+        return False
+    header = pd.read_csv(file_path, encoding=entry["encoding"], nrows=0)
+    return list(header.columns) == list(entry["schema"].columns)
+
+
+def load_dataset_checks(file_path, table_name):
+    """Check one source file, reusing cached results when it is unchanged"""
+    if not USE_CACHE:
+        return check_dataset(file_path, table_name)
+
+    cache_file = get_cache_file(file_path, table_name)
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as f:
+                entry = pickle.load(f)
+            if is_valid_cache_entry(entry, file_path):
+                return entry
+        except Exception:
+            pass  # Unreadable entry: fall through and rescan
+
+    entry = check_dataset(file_path, table_name)
+
+    # Keep a single entry per table so stale results do not pile up
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_file.parent.glob(f"{table_name}_*.pkl"):
+        stale.unlink()
+    with open(cache_file, "wb") as f:
+        pickle.dump(entry, f)
+
+    return entry
+
+
+def check_file(name_and_path):
+    """Worker entry point: check one file and return (name, entry or None)"""
+    name, file_path = name_and_path
+    try:
+        return name, load_dataset_checks(file_path, name)
+    except FileNotFoundError:
+        return name, None
+
+
+def check_header(name_and_path):
+    """Read only a file's header, returning (name, entry without checks or None)"""
+    name, file_path = name_and_path
+    try:
+        try:
+            schema, encoding = pd.read_csv(file_path, nrows=0), "utf-8"
+        except UnicodeDecodeError:
+            schema = pd.read_csv(file_path, nrows=0, encoding="latin-1")
+            encoding = "latin-1"
+    except FileNotFoundError:
+        return name, None
+    return name, {"dataset": None, "schema": schema, "encoding": encoding}
+
+
+def check_file_until_dirty(name_and_path):
+    """Check one file, stopping at the first chunk that shows it needs cleaning"""
+    name, file_path = name_and_path
+    try:
+        # A cached full result is cheaper than any re-read
+        if USE_CACHE and get_cache_file(file_path, name).exists():
+            return check_file(name_and_path)
+
+        def stop(acc):
+            return needs_cleaning(finalize_dataset(acc, name))
+
+        # Partial results are not cached; only full runs populate the cache
+        return name, check_dataset(file_path, name, stop)
+    except FileNotFoundError:
+        return name, None
+
+
+def needs_cleaning(dataset_config):
+    """Return True if any data check of a dataset asks for cleaning"""
+    checks = dataset_config["checks"]
+    return bool(
+        checks["duplicates"]["needed"]
+        or checks["missing_values"]["needed"]
+        or checks["data_types"]["needed"]
+        or checks.get("quality", {}).get("needed", False)
+    )
+
+
+def check_files_for_decision(tasks):
+    """Check files in order until one needs cleaning, then read headers only"""
+    results = []
+    cleaning_needed = False
+    for task in tasks:
+        if cleaning_needed:
+            results.append(check_header(task))
+            continue
+        name, entry = check_file_until_dirty(task)
+        results.append((name, entry))
+        cleaning_needed = entry is not None and needs_cleaning(entry["dataset"])
+    return results
+
+
 # ============================================================================
 # MAIN CHECK FUNCTION
 # ============================================================================
 
 
-def analyze_data_quality():
+def analyze_data_quality(mode=CHECK_MODE):
     """Analyze all datasets and return configuration for pipeline"""
 
     print("=" * 80)
@@ -240,57 +682,66 @@ def analyze_data_quality():
     }
     
     data_path = get_raw_data_dir()
-    dfs = {}
-    for name, file in files.items():
-        file_path = data_path / file
-        try:
-            df = pd.read_csv(file_path, encoding="utf-8")
-            dfs[name] = df
-            print(f"  ✓ {name}")
-        except UnicodeDecodeError:
-            df = pd.read_csv(file_path, encoding="latin-1")
-            dfs[name] = df
-            print(f"  ✓ {name} (latin-1)")
-        except FileNotFoundError:
+    tasks = [(name, data_path / file) for name, file in files.items()]
+
+    if mode == "decision":
+        results = check_files_for_decision(tasks)
+    else:
+        # Files are independent, so parse and check them in parallel
+        workers = max(1, min(len(tasks), MAX_WORKERS))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(check_file, tasks))
+
+    checked = {}
+    schemas = {}
+    skipped = []
+    partial = []
+    for (name, file_path), (_, entry) in zip(tasks, results):
+        if entry is None:
             print(f"  ✗ {name} - FILE NOT FOUND at {file_path}")
+            continue
+        # Only column names are kept; the schema frame is dropped here
+        schemas[name] = frozenset(entry.pop("schema").columns.astype(str))
+        checked[name] = entry
+        if entry["dataset"] is None:
+            skipped.append(name)
+            print(f"  ⊗ {name} (header only)")
+        elif entry.get("partial"):
+            partial.append(name)
+            print(f"  ✓ {name} (stopped at first issues)")
+        elif entry["encoding"] == "utf-8":
+            print(f"  ✓ {name}")
+        else:
+            print(f"  ✓ {name} ({entry['encoding']})")
 
     # Analyze each dataset
     print("\nAnalyzing data quality...")
     config = {
         "metadata": {
             "check_timestamp": datetime.now().isoformat(),
-            "datasets_analyzed": len(dfs),
+            "datasets_analyzed": len(checked) - len(skipped),
         },
+        # Every section is laid out up front, in the order it is written out
         "datasets": {},
+        "transformations": {},
+        "pipeline_steps": {},
+        "overall_quality_score": 0.0,
     }
 
-    for name, df in dfs.items():
-        print(f"\n  Checking {name}...")
-
-        dataset_config = {
-            "row_count": len(df),
-            "column_count": len(df.columns),
-            "checks": {
-                "column_standardization": check_column_standardization(df),
-                "duplicates": check_duplicates(df),
-                "missing_values": check_missing_values(df, name),
-                "data_types": check_data_types(df, name),
-            },
-        }
-
-        # Table-specific checks
-        if name == "products":
-            dataset_config["checks"]["quality"] = check_products_quality(df)
-        elif name == "order_items":
-            dataset_config["checks"]["quality"] = check_order_items_quality(df)
-        elif name == "customers":
-            dataset_config["checks"]["quality"] = check_customers_quality(df)
+    if mode == "decision":
+        config["metadata"]["mode"] = mode
+        config["metadata"]["skipped_datasets"] = skipped
+        config["metadata"]["partial_datasets"] = partial
 
-        config["datasets"][name] = dataset_config
+    for name, entry in checked.items():
+        if entry["dataset"] is None:
+            continue
+        print(f"\n  Checking {name}...")
+        config["datasets"][name] = entry["dataset"]
 
-    # Check transformations
+    # Check transformations (only column names are needed)
     print("\n  Checking transformations...")
-    config["transformations"] = check_transformations_needed(dfs)
+    config["transformations"] = check_transformations_needed(schemas)
 
     # Determine which pipeline steps are needed
     pipeline_steps = {
@@ -305,15 +756,17 @@ def analyze_data_quality():
             pipeline_steps["column_standardization"] = True
             break
 
+    # Header-only datasets: any() stops at the first badly named column
+    if not pipeline_steps["column_standardization"]:
+        pipeline_steps["column_standardization"] = any(
+            col != col.lower() or " " in col
+            for name in skipped
+            for col in schemas[name]
+        )
+
     # Check if any cleaning is needed
     for name, dataset_config in config["datasets"].items():
-        checks = dataset_config["checks"]
-        if (
-            checks["duplicates"]["needed"]
-            or checks["missing_values"]["needed"]
-            or checks["data_types"]["needed"]
-            or checks.get("quality", {}).get("needed", False)
-        ):
+        if needs_cleaning(dataset_config):
             pipeline_steps["data_cleaning"] = True
             break
 
@@ -377,48 +830,63 @@ def print_summary(config):
         else:
             print(f"  {name:15} : ✓ Clean")
 
+    for name in config["metadata"].get("skipped_datasets", []):
+        print(f"  {name:15} : ⊗ Not checked (fast mode)")
+
     print("\nTransformations Needed:")
     for trans_name, trans_config in config["transformations"].items():
         status = "✓ NEEDED" if trans_config["needed"] else "✗ SKIP"
         print(f"  {trans_name:25} : {status}")
 
+
+class ConfigDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+    """YAML dumper (libyaml when available) that understands numpy/pandas scalars"""
+
+
+ConfigDumper.add_multi_representer(
+    np.bool_, lambda dumper, value: dumper.represent_bool(bool(value))
+)
+ConfigDumper.add_multi_representer(
+    np.integer, lambda dumper, value: dumper.represent_int(int(value))
+)
+ConfigDumper.add_multi_representer(
+    np.floating, lambda dumper, value: dumper.represent_float(float(value))
+)
+ConfigDumper.add_multi_representer(
+    pd.Timestamp, lambda dumper, value: dumper.represent_str(value.isoformat())
+)
+
+
 def save_config_yaml(config):
-    # Convert all numpy/pandas types to native Python types
-    def convert(o):
-        if isinstance(o, (np.bool_, np.bool)):
-            return bool(o)
-        if isinstance(o, (np.integer,)):
-            return int(o)
-        if isinstance(o, (np.floating,)):
-            return float(o)
-        if isinstance(o, (pd.Timestamp,)):
-            return o.isoformat()
-        if isinstance(o, dict):
-            return {k: convert(v) for k, v in o.items()}
-        if isinstance(o, list):
-            return [convert(i) for i in o]
-        return o
-
-    clean_config = convert(config)
-    
+    # numpy/pandas scalars are converted by the dumper's representers
     config_path = get_config_path()
     with open(config_path, "w") as f:
-        yaml.dump(clean_config, f, sort_keys=False, default_flow_style=False)
+        yaml.dump(
+            config,
+            f,
+            Dumper=ConfigDumper,
+            sort_keys=False,
+            default_flow_style=False,
+            width=1000,  # Long issue strings stay on one line
+        )
 
     print(f"✓ Configuration saved to {config_path}")
 
 
-
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
 
-def main():
+def main(mode=None):
     """Run data quality checks and generate pipeline configuration"""
 
+    # --fast on the command line selects the decision-only mode
+    if mode is None:
+        mode = "decision" if "--fast" in sys.argv else CHECK_MODE
+
     # Analyze data
-    config = analyze_data_quality()
+    config = analyze_data_quality(mode)
 
     # Print summary
     print_summary(config)
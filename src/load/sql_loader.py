@@ -1,19 +1,26 @@
 """
 SQL SERVER DATA LOADER
-Purpose: Load cleaned data from CSV files into SQL Server
+Purpose: Load cleaned data from Parquet (or CSV) files into SQL Server
 Reads from: data/processed/ directory
 """
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from sqlalchemy import text
+import hashlib
 import os
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 # Ensure src module can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from src.utils.config_loader import get_processed_data_dir
+from src.utils.config_loader import get_processed_data_dir, get_cache_dir
+from src.utils.db import get_engine, SQL_SERVER, SQL_DATABASE, USE_WINDOWS_AUTH, FAST_EXECUTEMANY
 
 warnings.filterwarnings('ignore')
 
@@ -21,17 +28,82 @@ warnings.filterwarnings('ignore')
 # CONFIGURATION
 # ============================================================================
 
-# SQL Server connection settings
-SQL_SERVER = 'DESKTOP-LF8V7TT'
-SQL_DATABASE = 'RetailDB'
-SQL_DRIVER = 'ODBC Driver 17 for SQL Server'
+# Rows sent per executemany batch; tune for the server and network
+BATCH_SIZE = 10_000
 
-# Set to True for Windows Authentication, False for SQL Server Authentication
-USE_WINDOWS_AUTH = True
+# Cleaned files are read concurrently with Arrow's multithreaded readers
+READ_WORKERS = os.cpu_count() or 1
 
-# SQL Server Authentication credentials (if USE_WINDOWS_AUTH = False)
-SQL_USERNAME = 'your_username'
-SQL_PASSWORD = 'your_password'
+# Keep a Parquet copy of each parsed CSV, so unchanged files skip the parse
+# on the next run; bump the version when LOAD_COLUMN_TYPES changes
+USE_LOAD_CACHE = True
+LOAD_CACHE_VERSION = 1
+
+# Column types matching the SQL schema, applied while parsing the cleaned
+# CSVs (so phones and zip codes stay text instead of being read as numbers)
+_INT, _FLOAT, _TEXT, _DATETIME = pa.int32(), pa.float64(), pa.string(), pa.timestamp('s')
+LOAD_COLUMN_TYPES = {
+    'brands': {'brand_id': _INT, 'brand_name': _TEXT},
+    'categories': {'category_id': _INT, 'category_name': _TEXT},
+    'stores': {
+        'store_id': _INT, 'store_name': _TEXT, 'phone': _TEXT, 'email': _TEXT,
+        'street': _TEXT, 'city': _TEXT, 'state': _TEXT, 'zip_code': _TEXT,
+    },
+    'staffs': {
+        'staff_id': _INT, 'first_name': _TEXT, 'last_name': _TEXT, 'email': _TEXT,
+        'phone': _TEXT, 'active': _INT, 'store_id': _INT, 'manager_id': _INT,
+    },
+    'products': {
+        'product_id': _INT, 'product_name': _TEXT, 'brand_id': _INT, 'category_id': _INT,
+        'model_year': _INT, 'list_price': _FLOAT, 'brand_name': _TEXT, 'category_name': _TEXT,
+    },
+    'customers': {
+        'customer_id': _INT, 'first_name': _TEXT, 'last_name': _TEXT, 'phone': _TEXT,
+        'email': _TEXT, 'street': _TEXT, 'city': _TEXT, 'state': _TEXT,
+        'zip_code': _TEXT, 'full_name': _TEXT,
+    },
+    'orders': {
+        'order_id': _INT, 'customer_id': _INT, 'order_status': _INT,
+        'order_date': _DATETIME, 'required_date': _DATETIME, 'shipped_date': _DATETIME,
+        'store_id': _INT, 'staff_id': _INT, 'order_total': _FLOAT,
+    },
+    'order_items': {
+        'order_id': _INT, 'item_id': _INT, 'product_id': _INT, 'quantity': _INT,
+        'list_price': _FLOAT, 'discount': _FLOAT, 'total_price': _FLOAT,
+    },
+    'stocks': {'store_id': _INT, 'product_id': _INT, 'quantity': _INT},
+}
+
+# Large tables loaded with a minimally logged BULK INSERT from a staged CSV.
+# Needs a directory the SQL Server service can read (a local path when the
+# server runs on this machine, or a UNC share); None keeps to_sql for all
+BULK_INSERT_DIR = None
+BULK_INSERT_TABLES = ['Orders', 'OrderItems']
+
+# SQL Server limits for one multi-row INSERT (used without fast_executemany)
+MAX_STATEMENT_PARAMETERS = 2100
+MAX_INSERT_ROWS = 1000
+
+# Tables in foreign-key dependency order (referenced tables first)
+SCHEMA_TABLES = [
+    'Brands', 'Categories', 'Stores', 'Staffs',
+    'Products', 'Customers', 'Orders', 'OrderItems', 'Stocks'
+]
+
+# Tables no foreign key points at: the only ones SQL Server can TRUNCATE
+UNREFERENCED_TABLES = ['OrderItems', 'Stocks']
+
+# Nonclustered indexes on the join keys the reporting queries aggregate over,
+# built after the bulk load (name, table, key columns, included columns)
+REPORTING_INDEXES = [
+    ('IX_OrderItems_product_id', 'OrderItems', 'product_id', 'quantity, list_price, total_price'),
+    ('IX_Orders_customer_id', 'Orders', 'customer_id', 'order_total'),
+    ('IX_Orders_store_id', 'Orders', 'store_id', 'order_total'),
+    ('IX_Orders_staff_id', 'Orders', 'staff_id', 'order_total'),
+    ('IX_Orders_order_status', 'Orders', 'order_status', 'order_total'),
+    ('IX_Orders_order_date', 'Orders', 'order_date', 'order_total'),
+    ('IX_Stocks_product_id', 'Stocks', 'product_id', 'quantity'),
+]
 
 print("="*80)
 print("SQL SERVER DATA LOADER")
@@ -42,8 +114,83 @@ print("="*80)
 # LOAD CLEANED DATA
 # ============================================================================
 
+def parse_cleaned_csv(filepath, table_name):
+    """Parse a cleaned CSV into an Arrow table, typed to match its SQL table"""
+    # Empty text cells load as NULL, as they did with pd.read_csv
+    options = pacsv.ConvertOptions(
+        column_types=LOAD_COLUMN_TYPES.get(table_name, {}), strings_can_be_null=True
+    )
+    return pacsv.read_csv(filepath, convert_options=options)
+
+
+def get_load_cache_file(filepath, table_name):
+    """Parquet cache location, keyed on the CSV's path, mtime and size"""
+    stat = os.stat(filepath)
+    key = f"{LOAD_CACHE_VERSION}:{filepath}:{stat.st_mtime_ns}:{stat.st_size}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return get_cache_dir() / "sql_loader" / f"{table_name}_{digest}.parquet"
+
+
+def read_cleaned_csv(filepath, table_name):
+    """Load a cleaned CSV as a DataFrame, from the Parquet cache when unchanged"""
+    if not USE_LOAD_CACHE:
+        return parse_cleaned_csv(filepath, table_name).to_pandas()
+    
+    cache_file = get_load_cache_file(filepath, table_name)
+    if cache_file.exists():
+        try:
+            return pq.read_table(cache_file).to_pandas()
+        except Exception:
+            pass  # Unreadable entry: fall through and re-parse
+    
+    table = parse_cleaned_csv(filepath, table_name)
+    
+    # Keep a single entry per table so stale copies do not pile up
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_file.parent.glob(f"{table_name}_*.parquet"):
+        stale.unlink()
+    pq.write_table(table, cache_file, compression='zstd')
+    
+    return table.to_pandas()
+
+
+def read_cleaned_parquet(filepath, table_name):
+    """Load a cleaned Parquet file as a DataFrame, typed to match its SQL table"""
+    table = pq.read_table(filepath).replace_schema_metadata(None)
+    column_types = LOAD_COLUMN_TYPES.get(table_name, {})
+    # Same column types as the CSV path (categoricals come back as plain text)
+    schema = pa.schema([
+        pa.field(field.name, column_types.get(field.name, field.type)) for field in table.schema
+    ])
+    table = table.cast(schema)
+    
+    # Empty text loads as NULL, matching the CSV path
+    for i, field in enumerate(table.schema):
+        if field.type == pa.string():
+            column = table.column(i)
+            column = pc.if_else(pc.equal(column, ''), pa.scalar(None, pa.string()), column)
+            table = table.set_column(i, field, column)
+    return table.to_pandas()
+
+
+def read_cleaned_file(filepath, table_name):
+    """Load one cleaned file, Parquet or CSV"""
+    if filepath.suffix == '.parquet':
+        return read_cleaned_parquet(filepath, table_name)
+    return read_cleaned_csv(filepath, table_name)
+
+
+def find_cleaned_file(directory, table_name):
+    """Cleaned file for a table: the Parquet output, else a --format=csv one"""
+    for extension in ('parquet', 'csv'):
+        filepath = directory / f'cleaned_{table_name}.{extension}'
+        if filepath.exists():
+            return filepath
+    return None
+
+
 def load_cleaned_data():
-    """Load cleaned CSV files from output directory"""
+    """Load cleaned Parquet (or CSV) files from output directory"""
     print("\n" + "="*80)
     print("LOADING CLEANED DATA")
     print("="*80)
@@ -55,31 +202,30 @@ def load_cleaned_data():
         print("   Please run transform_pipeline.py first")
         return None
     
-    files = [
-        'cleaned_brands.csv',
-        'cleaned_categories.csv',
-        'cleaned_products.csv',
-        'cleaned_customers.csv',
-        'cleaned_orders.csv',
-        'cleaned_order_items.csv',
-        'cleaned_staffs.csv',
-        'cleaned_stores.csv',
-        'cleaned_stocks.csv'
+    table_names = [
+        'brands', 'categories', 'products', 'customers', 'orders',
+        'order_items', 'staffs', 'stores', 'stocks'
     ]
     
     dfs = {}
     missing_files = []
     
-    for file in files:
-        filepath = cleaned_data_path / file
-        table_name = file.replace('cleaned_', '').replace('.csv', '')
-        
-        if filepath.exists():
-            df = pd.read_csv(filepath)
+    # Read every file at once; Arrow releases the GIL while it reads
+    with ThreadPoolExecutor(max_workers=min(len(table_names), READ_WORKERS)) as executor:
+        futures = []
+        for table_name in table_names:
+            filepath = find_cleaned_file(cleaned_data_path, table_name)
+            futures.append(
+                executor.submit(read_cleaned_file, filepath, table_name) if filepath else None
+            )
+    
+    for table_name, future in zip(table_names, futures):
+        if future is not None:
+            df = future.result()
             dfs[table_name] = df
             print(f"✓ {table_name:15} : {len(df):,} rows loaded")
         else:
-            missing_files.append(file)
+            missing_files.append(f'cleaned_{table_name}.parquet (or .csv)')
             print(f"✗ {table_name:15} : FILE NOT FOUND")
     
     if missing_files:
@@ -104,24 +250,15 @@ def create_sql_connection():
     
     try:
         if USE_WINDOWS_AUTH:
-            # Windows Authentication
-            connection_string = (
-                f'mssql+pyodbc://{SQL_SERVER}/{SQL_DATABASE}?'
-                f'driver={SQL_DRIVER}&trusted_connection=yes'
-            )
             print(f"\nConnection mode: Windows Authentication")
         else:
-            # SQL Server Authentication
-            connection_string = (
-                f'mssql+pyodbc://{SQL_USERNAME}:{SQL_PASSWORD}@'
-                f'{SQL_SERVER}/{SQL_DATABASE}?driver={SQL_DRIVER}'
-            )
             print(f"\nConnection mode: SQL Server Authentication")
         
         print(f"Server: {SQL_SERVER}")
         print(f"Database: {SQL_DATABASE}")
         
-        engine = create_engine(connection_string)
+        # Shared engine: reused by any other stage running in this process
+        engine = get_engine()
         
         # Test connection
         with engine.connect() as conn:
@@ -147,37 +284,31 @@ def create_sql_connection():
 # CREATE DATABASE SCHEMA
 # ============================================================================
 
-def create_database_schema(engine):
+def create_database_schema(conn):
     """Create all database tables with proper relationships"""
     print("\n" + "="*80)
     print("CREATING DATABASE SCHEMA")
     print("="*80)
     
+    # Tables are only created when missing; existing ones keep their pages,
+    # statistics and cached plans and are emptied by prepare_for_reload
     sql_script = """
-    -- Drop tables in reverse order of dependencies
-    IF OBJECT_ID('Stocks', 'U') IS NOT NULL DROP TABLE Stocks;
-    IF OBJECT_ID('OrderItems', 'U') IS NOT NULL DROP TABLE OrderItems;
-    IF OBJECT_ID('Orders', 'U') IS NOT NULL DROP TABLE Orders;
-    IF OBJECT_ID('Customers', 'U') IS NOT NULL DROP TABLE Customers;
-    IF OBJECT_ID('Products', 'U') IS NOT NULL DROP TABLE Products;
-    IF OBJECT_ID('Staffs', 'U') IS NOT NULL DROP TABLE Staffs;
-    IF OBJECT_ID('Stores', 'U') IS NOT NULL DROP TABLE Stores;
-    IF OBJECT_ID('Categories', 'U') IS NOT NULL DROP TABLE Categories;
-    IF OBJECT_ID('Brands', 'U') IS NOT NULL DROP TABLE Brands;
-    
     -- Create Brands table
+    IF OBJECT_ID('Brands', 'U') IS NULL
     CREATE TABLE Brands (
         brand_id INT PRIMARY KEY,
         brand_name NVARCHAR(255) NOT NULL
     );
     
     -- Create Categories table
+    IF OBJECT_ID('Categories', 'U') IS NULL
     CREATE TABLE Categories (
         category_id INT PRIMARY KEY,
         category_name NVARCHAR(255) NOT NULL
     );
     
     -- Create Stores table
+    IF OBJECT_ID('Stores', 'U') IS NULL
     CREATE TABLE Stores (
         store_id INT PRIMARY KEY,
         store_name NVARCHAR(255),
@@ -190,6 +321,7 @@ def create_database_schema(engine):
     );
     
     -- Create Staffs table
+    IF OBJECT_ID('Staffs', 'U') IS NULL
     CREATE TABLE Staffs (
         staff_id INT PRIMARY KEY,
         first_name NVARCHAR(50),
@@ -203,6 +335,7 @@ def create_database_schema(engine):
     );
     
     -- Create Products table
+    IF OBJECT_ID('Products', 'U') IS NULL
     CREATE TABLE Products (
         product_id INT PRIMARY KEY,
         product_name NVARCHAR(255) NOT NULL,
@@ -217,6 +350,7 @@ def create_database_schema(engine):
     );
     
     -- Create Customers table
+    IF OBJECT_ID('Customers', 'U') IS NULL
     CREATE TABLE Customers (
         customer_id INT PRIMARY KEY,
         first_name NVARCHAR(255),
@@ -231,6 +365,7 @@ def create_database_schema(engine):
     );
     
     -- Create Orders table
+    IF OBJECT_ID('Orders', 'U') IS NULL
     CREATE TABLE Orders (
         order_id INT PRIMARY KEY,
         customer_id INT,
@@ -247,6 +382,7 @@ def create_database_schema(engine):
     );
     
     -- Create OrderItems table
+    IF OBJECT_ID('OrderItems', 'U') IS NULL
     CREATE TABLE OrderItems (
         order_id INT,
         item_id INT,
@@ -261,6 +397,7 @@ def create_database_schema(engine):
     );
     
     -- Create Stocks table
+    IF OBJECT_ID('Stocks', 'U') IS NULL
     CREATE TABLE Stocks (
         store_id INT,
         product_id INT,
@@ -272,22 +409,17 @@ def create_database_schema(engine):
     """
     
     try:
-        print("\nDropping existing tables (if any)...")
-        print("Creating new tables...")
+        print("\nCreating missing tables (existing tables are kept)...")
         
-        with engine.begin() as conn:
+        with conn.begin():
             # Execute each statement separately
             statements = [s.strip() for s in sql_script.split(';') if s.strip()]
             for statement in statements:
                 conn.execute(text(statement))
         
-        print("\n✓ Database schema created successfully")
-        print("\nTables created:")
-        tables = [
-            'Brands', 'Categories', 'Stores', 'Staffs', 
-            'Products', 'Customers', 'Orders', 'OrderItems', 'Stocks'
-        ]
-        for table in tables:
+        print("\n✓ Database schema ready")
+        print("\nTables:")
+        for table in SCHEMA_TABLES:
             print(f"  ✓ {table}")
         
         return True
@@ -298,11 +430,92 @@ def create_database_schema(engine):
         return False
 
 
+def prepare_for_reload(conn):
+    """Empty every table, with FK checks and reporting indexes off for the load"""
+    print("\n" + "="*80)
+    print("PREPARING TABLES FOR RELOAD")
+    print("="*80)
+    
+    try:
+        # The load then skips per-row FK checks and index maintenance;
+        # restore_constraints and ensure_indexes turn both back on
+        for table in SCHEMA_TABLES:
+            conn.execute(text(f"ALTER TABLE {table} NOCHECK CONSTRAINT ALL"))
+        for index_name, table, _, _ in REPORTING_INDEXES:
+            conn.execute(text(
+                f"IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{index_name}' "
+                f"AND object_id = OBJECT_ID('{table}')) "
+                f"ALTER INDEX {index_name} ON {table} DISABLE"
+            ))
+        
+        # Children first, so no emptied parent is still referenced
+        print()
+        for table in reversed(SCHEMA_TABLES):
+            if table in UNREFERENCED_TABLES:
+                conn.execute(text(f"TRUNCATE TABLE {table}"))
+            else:
+                conn.execute(text(f"DELETE FROM {table}"))
+            print(f"  ✓ {table:15} : emptied")
+        
+        return True
+    
+    except Exception as e:
+        print(f"\n✗ Preparing tables failed!")
+        print(f"   Error: {e}")
+        return False
+
+
+def restore_constraints(conn):
+    """Re-enable and validate every foreign key after the load"""
+    print("\n" + "="*80)
+    print("VALIDATING FOREIGN KEYS")
+    print("="*80)
+    
+    try:
+        # WITH CHECK re-validates the loaded rows, so the keys stay trusted
+        for table in SCHEMA_TABLES:
+            conn.execute(text(f"ALTER TABLE {table} WITH CHECK CHECK CONSTRAINT ALL"))
+        
+        print("\n✓ Foreign keys enabled and validated")
+        return True
+    
+    except Exception as e:
+        print(f"\n✗ Foreign key validation failed!")
+        print(f"   Error: {e}")
+        return False
+
+
 # ============================================================================
 # LOAD DATA TO SQL SERVER
 # ============================================================================
 
-def load_data_to_sql(dfs, engine):
+def insert_options(column_count):
+    """to_sql batching arguments for a table with column_count columns"""
+    if FAST_EXECUTEMANY:
+        # Plain executemany in BATCH_SIZE batches; fast_executemany binds each
+        # batch as arrays (method='multi' would defeat the array binding)
+        return {'chunksize': BATCH_SIZE}
+    
+    # Otherwise one multi-row INSERT per chunk, within the parameter limit
+    rows = (MAX_STATEMENT_PARAMETERS - 1) // max(column_count, 1)
+    return {'method': 'multi', 'chunksize': max(1, min(rows, MAX_INSERT_ROWS))}
+
+
+def bulk_insert(conn, df, table_name):
+    """Stage df as a CSV in BULK_INSERT_DIR and BULK INSERT it into table_name"""
+    csv_path = os.path.join(BULK_INSERT_DIR, f"{table_name}.csv")
+    # Columns in table order; ISO 8601 timestamps parse the same under any DATEFORMAT
+    df.to_csv(csv_path, index=False, header=False, date_format='%Y-%m-%dT%H:%M:%S')
+    try:
+        conn.execute(text(
+            f"BULK INSERT {table_name} FROM '{csv_path}' "
+            f"WITH (FORMAT = 'CSV', CODEPAGE = '65001', KEEPNULLS, TABLOCK, BATCHSIZE = {BATCH_SIZE})"
+        ))
+    finally:
+        os.remove(csv_path)
+
+
+def load_data_to_sql(dfs, conn):
     """Load data into SQL Server tables"""
     print("\n" + "="*80)
     print("LOADING DATA TO SQL SERVER")
@@ -333,8 +546,19 @@ def load_data_to_sql(dfs, engine):
             
             df = dfs[df_name]
             
-            # Load data
-            df.to_sql(table_name, engine, if_exists='append', index=False)
+            # Cleaned files written before full_name existed still fill the column
+            if df_name == 'customers' and 'full_name' not in df.columns:
+                df = df.assign(full_name=df['first_name'].fillna('').str.cat(
+                    df['last_name'].fillna(''), sep=' '
+                ))
+            
+            if BULK_INSERT_DIR and table_name in BULK_INSERT_TABLES:
+                bulk_insert(conn, df[list(LOAD_COLUMN_TYPES[df_name])], table_name)
+            else:
+                df.to_sql(
+                    table_name, conn, if_exists='append', index=False,
+                    **insert_options(len(df.columns))
+                )
             
             loaded_count += 1
             total_rows += len(df)
@@ -350,28 +574,57 @@ def load_data_to_sql(dfs, engine):
         return False
 
 
+# ============================================================================
+# CREATE REPORTING INDEXES
+# ============================================================================
+
+def ensure_indexes(conn):
+    """Create the reporting indexes that do not exist yet"""
+    print("\n" + "="*80)
+    print("CREATING REPORTING INDEXES")
+    print("="*80)
+    
+    try:
+        with conn.begin():
+            for index_name, table, keys, included in REPORTING_INDEXES:
+                # Create a missing index, or rebuild one disabled for the load
+                conn.execute(text(
+                    f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{index_name}' "
+                    f"AND object_id = OBJECT_ID('{table}')) "
+                    f"CREATE NONCLUSTERED INDEX {index_name} ON {table} ({keys}) INCLUDE ({included}) "
+                    f"ELSE IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{index_name}' "
+                    f"AND object_id = OBJECT_ID('{table}') AND is_disabled = 1) "
+                    f"ALTER INDEX {index_name} ON {table} REBUILD"
+                ))
+                print(f"  ✓ {index_name}")
+        return True
+    
+    except Exception as e:
+        print(f"\n⚠️  Index creation failed: {e}")
+        return False
+
+
 # ============================================================================
 # VERIFY DATA LOAD
 # ============================================================================
 
-def verify_data_load(engine):
+def verify_data_load(conn):
     """Verify data was loaded correctly"""
     print("\n" + "="*80)
     print("VERIFYING DATA LOAD")
     print("="*80)
     
-    tables = [
-        'Brands', 'Categories', 'Stores', 'Staffs',
-        'Products', 'Customers', 'Orders', 'OrderItems', 'Stocks'
-    ]
+    # Every count in one round-trip; exact, unlike the partition metadata
+    count_sql = " UNION ALL ".join(
+        f"SELECT '{table}', COUNT(*) FROM {table}" for table in SCHEMA_TABLES
+    )
     
     print("\nTable row counts:")
     try:
-        with engine.connect() as conn:
-            for table in tables:
-                result = conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                count = result.fetchone()[0]
-                print(f"  {table:15} : {count:,} rows")
+        with conn.begin():
+            counts = dict(conn.execute(text(count_sql)).fetchall())
+        for table in SCHEMA_TABLES:
+            print(f"  {table:15} : {counts[table]:,} rows")
         
         print("\n✓ Data verification complete")
         return True
@@ -407,24 +660,37 @@ def main():
         print("="*80)
         return False
     
-    # Step 3: Create database schema
-    schema_created = create_database_schema(engine)
-    if not schema_created:
-        print("\n" + "="*80)
-        print("❌ LOADING ABORTED")
-        print("="*80)
-        return False
-    
-    # Step 4: Load data to SQL Server
-    data_loaded = load_data_to_sql(dfs, engine)
-    if not data_loaded:
-        print("\n" + "="*80)
-        print("❌ LOADING FAILED")
-        print("="*80)
-        return False
-    
-    # Step 5: Verify data load
-    verified = verify_data_load(engine)
+    # Every step runs on this one connection (one login)
+    with engine.connect() as conn:
+        # Step 3: Create missing tables
+        if not create_database_schema(conn):
+            print("\n" + "="*80)
+            print("❌ LOADING ABORTED")
+            print("="*80)
+            return False
+        
+        # Step 4: Empty the tables, load the data and re-enable the foreign keys
+        # in one transaction; if any part fails, the rollback leaves the previous
+        # rows, constraints and indexes exactly as they were
+        transaction = conn.begin()
+        data_loaded = (
+            prepare_for_reload(conn)
+            and load_data_to_sql(dfs, conn)
+            and restore_constraints(conn)
+        )
+        if not data_loaded:
+            transaction.rollback()
+            print("\n" + "="*80)
+            print("❌ LOADING FAILED (previous data kept)")
+            print("="*80)
+            return False
+        transaction.commit()
+        
+        # Step 5: Index the join keys used by the reports (not fatal if it fails)
+        indexed = ensure_indexes(conn)
+        
+        # Step 6: Verify data load
+        verified = verify_data_load(conn)
     
     # Summary
     print("\n" + "="*80)
@@ -433,8 +699,9 @@ def main():
     
     print("\n✓ Process Complete:")
     print(f"  ✓ Cleaned data loaded from: {get_processed_data_dir()}")
-    print(f"  ✓ Database schema created")
+    print(f"  ✓ Database schema ready and tables reloaded")
     print(f"  ✓ Data loaded to: {SQL_SERVER}/{SQL_DATABASE}")
+    print(f"  {'✓' if indexed else '⚠️ '} Reporting indexes: {'Created' if indexed else 'Skipped'}")
     print(f"  ✓ Data verification: {'Passed' if verified else 'Skipped'}")
     
     print("\n" + "="*80)
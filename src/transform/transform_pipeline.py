@@ -1,20 +1,27 @@
 """
 DATA TRANSFORMATION PIPELINE
 Purpose: Clean and transform data based on configuration
-Output: Cleaned CSV files ready for loading
+Output: Cleaned Parquet (or CSV) files ready for loading
 """
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import hashlib
+import json
 import yaml
 import os
 import warnings
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 
 # Ensure src module can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from src.utils.config_loader import get_raw_data_dir, get_processed_data_dir, load_config
+from src.utils.config_loader import get_raw_data_dir, get_processed_data_dir, get_cache_dir, load_config
 
 warnings.filterwarnings("ignore")
 
@@ -22,6 +29,103 @@ warnings.filterwarnings("ignore")
 # CONFIGURATION
 # ============================================================================
 
+# Source CSVs in data/raw, by table
+SOURCE_FILES = {
+    "brands": "brands.csv",
+    "categories": "categories.csv",
+    "products": "products.csv",
+    "customers": "customers.csv",
+    "orders": "orders.csv",
+    "order_items": "order_items.csv",
+    "staffs": "staffs.csv",
+    "stores": "stores.csv",
+    "stocks": "stocks.csv",
+}
+
+# Worker processes used to clean datasets in parallel
+MAX_WORKERS = os.cpu_count() or 1
+
+# Below this much input, datasets are cleaned on threads instead: starting
+# worker processes and pickling the frames would cost more than it saves
+PROCESS_POOL_MIN_BYTES = 100 * 1024 * 1024
+
+# Source CSVs are read concurrently, one thread per file
+READ_WORKERS = os.cpu_count() or 1
+
+# Cleaned files are written concurrently, one thread per file
+WRITE_WORKERS = os.cpu_count() or 1
+
+# Parse source CSVs with Arrow's multithreaded reader (False: pandas' C parser)
+USE_ARROW_CSV = True
+
+# Keep a Parquet copy of each parsed source CSV (Arrow reader only), so
+# unchanged files skip the parse on the next run
+USE_SOURCE_CACHE = True
+SOURCE_CACHE_VERSION = 1
+
+# Repetitive text columns held as categoricals once cleaned: smaller frames
+# to send back from the workers and to write out
+LOW_CARDINALITY_COLUMNS = {
+    "customers": ["city", "state"],
+    "stores": ["city", "state"],
+    "products": ["brand_name", "category_name"],
+}
+
+# Primary key of each table (as in the SQL schema); a repeated key is a
+# duplicate row, and only the first copy is kept
+PRIMARY_KEYS = {
+    "brands": ["brand_id"],
+    "categories": ["category_id"],
+    "products": ["product_id"],
+    "customers": ["customer_id"],
+    "orders": ["order_id"],
+    "order_items": ["order_id", "item_id"],
+    "staffs": ["staff_id"],
+    "stores": ["store_id"],
+    "stocks": ["store_id", "product_id"],
+}
+
+# Rows per block when computing item totals, small enough for the
+# intermediates to stay in cache
+ITEM_TOTAL_BLOCK_ROWS = 16_384
+
+# Values filled into missing text fields, per table
+TEXT_DEFAULTS = {
+    "customers": {
+        "first_name": "Unknown", "last_name": "Unknown", "email": "unknown@email.com",
+        "phone": "Unknown", "street": "Unknown", "city": "Unknown", "state": "Unknown",
+        "zip_code": "00000",
+    },
+    "staffs": {
+        "first_name": "Unknown", "last_name": "Unknown", "email": "unknown@email.com",
+        "phone": "Unknown",
+    },
+    "stores": {
+        "store_name": "Unknown", "phone": "Unknown", "email": "unknown@email.com",
+        "street": "Unknown", "city": "Unknown", "state": "Unknown", "zip_code": "00000",
+    },
+}
+
+# Order dates before this are treated as mistyped years (e.g. 1016)
+EARLIEST_VALID_DATE = pd.Timestamp("1900-01-01")
+
+# Reuse a table's cleaned file when its source contents, configuration, the
+# output format and this module are unchanged since it was written and the
+# file is intact (--no-cache on the command line re-processes everything)
+SKIP_UNCHANGED_TABLES = True
+MANIFEST_VERSION = 1
+
+# Tables whose cleaned data feeds another table's transformation: products
+# take brand/category names, orders take the sum of their items
+TABLE_DEPENDENCIES = {
+    "products": ["brands", "categories"],
+    "orders": ["order_items"],
+}
+
+# Format of the cleaned files handed to the loader: "parquet" (zstd) or "csv";
+# --format=csv on the command line writes CSVs instead
+OUTPUT_FORMAT = "parquet"
+
 print("=" * 80)
 print("DATA TRANSFORMATION PIPELINE")
 print("=" * 80)
@@ -31,40 +135,105 @@ print("=" * 80)
 # ============================================================================
 
 
-def load_data():
-    """Load all CSV files from source directory"""
+def parse_source_csv(file_path, encoding="utf-8"):
+    """Parse one source CSV into an Arrow table"""
+    # Empty cells load as NaN, as with pd.read_csv
+    table = pacsv.read_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(encoding=encoding),
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+    )
+    # Text that is not valid in this encoding is inferred as binary
+    if any(pa.types.is_binary(field.type) for field in table.schema):
+        raise UnicodeDecodeError(encoding, b"", 0, 0, f"invalid {encoding} text in {file_path}")
+    return table
+
+
+def to_source_frame(table):
+    """Convert a parsed source table to pandas"""
+    # Date columns arrive as datetime64 instead of Python date objects, so
+    # the cleaners' date parsing has nothing left to convert
+    return table.to_pandas(date_as_object=False)
+
+
+def read_source_csv(file_path, encoding="utf-8"):
+    """Read one source CSV into a DataFrame"""
+    if not USE_ARROW_CSV:
+        return pd.read_csv(file_path, encoding=encoding)
+    return to_source_frame(parse_source_csv(file_path, encoding))
+
+
+def get_source_cache_file(file_path):
+    """Parquet cache location, keyed on the CSV's path, mtime and size"""
+    stat = os.stat(file_path)
+    key = f"{SOURCE_CACHE_VERSION}:{file_path}:{stat.st_mtime_ns}:{stat.st_size}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return get_cache_dir() / "transform" / f"{file_path.stem}_{digest}.parquet"
+
+
+def load_cached_source(file_path):
+    """Read a source CSV via the Parquet cache; returns (df, encoding)"""
+    cache_file = get_source_cache_file(file_path)
+    if cache_file.exists():
+        try:
+            table = pq.read_table(cache_file)
+            return to_source_frame(table), table.schema.metadata[b"encoding"].decode()
+        except Exception:
+            pass  # Unreadable entry: fall through and re-parse
+
+    try:
+        table, encoding = parse_source_csv(file_path), "utf-8"
+    except UnicodeDecodeError:
+        table, encoding = parse_source_csv(file_path, encoding="latin-1"), "latin-1"
+
+    # Keep a single entry per file so stale copies do not pile up
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_file.parent.glob(f"{file_path.stem}_*.parquet"):
+        stale.unlink()
+    pq.write_table(
+        table.replace_schema_metadata({"encoding": encoding}), cache_file, compression="zstd"
+    )
+
+    return to_source_frame(table), encoding
+
+
+def load_source_file(file_path):
+    """Read a source CSV as UTF-8, falling back to latin-1; returns (df, encoding)"""
+    if USE_ARROW_CSV and USE_SOURCE_CACHE:
+        return load_cached_source(file_path)
+    try:
+        return read_source_csv(file_path), "utf-8"
+    except UnicodeDecodeError:
+        return read_source_csv(file_path, encoding="latin-1"), "latin-1"
+
+
+def load_data(names=None):
+    """Load the source CSVs (all tables unless names are given)"""
     print("\n" + "=" * 80)
     print("LOADING SOURCE DATA")
     print("=" * 80)
 
-    files = {
-        "brands": "brands.csv",
-        "categories": "categories.csv",
-        "products": "products.csv",
-        "customers": "customers.csv",
-        "orders": "orders.csv",
-        "order_items": "order_items.csv",
-        "staffs": "staffs.csv",
-        "stores": "stores.csv",
-        "stocks": "stocks.csv",
-    }
-    
     data_path = get_raw_data_dir()
     dfs = {}
-    for name, file in files.items():
-        file_path = data_path / file
+    
+    # Read every file at once; the parsers release the GIL. Results are
+    # reported in file order
+    files = {name: SOURCE_FILES[name] for name in (names or SOURCE_FILES)}
+    with ThreadPoolExecutor(max_workers=max(1, min(len(files), READ_WORKERS))) as executor:
+        futures = {
+            name: executor.submit(load_source_file, data_path / file)
+            for name, file in files.items()
+        }
+    
+    for name, future in futures.items():
         try:
-            df = pd.read_csv(file_path, encoding="utf-8")
-            dfs[name] = df
-            print(f"✓ {name:15} : {df.shape[0]:6} rows × {df.shape[1]:3} columns")
-        except UnicodeDecodeError:
-            df = pd.read_csv(file_path, encoding="latin-1")
-            dfs[name] = df
-            print(
-                f"✓ {name:15} : {df.shape[0]:6} rows × {df.shape[1]:3} columns (latin-1)"
-            )
+            df, encoding = future.result()
         except FileNotFoundError:
-            print(f"✗ {name:15} : FILE NOT FOUND at {file_path}")
+            print(f"✗ {name:15} : FILE NOT FOUND at {data_path / files[name]}")
+            continue
+        dfs[name] = df
+        suffix = f" ({encoding})" if encoding != "utf-8" else ""
+        print(f"✓ {name:15} : {df.shape[0]:6} rows × {df.shape[1]:3} columns{suffix}")
 
     print(f"\n📊 Total datasets loaded: {len(dfs)}")
     return dfs
@@ -109,14 +278,32 @@ def standardize_columns(dfs, config):
 # ============================================================================
 
 
+def digits_only(values):
+    """Strip every non-digit character from a column of phone numbers"""
+    # Arrow-backed strings run the regex as one RE2 pass over the whole column
+    # (object columns, the pandas 2 default, would call Python's re per value)
+    return values.astype("string[pyarrow]").str.replace(r"\D", "", regex=True).astype(str)
+
+
+def valid_rows(checks, reason):
+    """Combine per-column validity masks, reporting drops column by column"""
+    mask_valid = np.ones(len(next(iter(checks.values()))), dtype=bool)
+    for col, valid in checks.items():
+        remaining = mask_valid & valid.to_numpy()
+        dropped = mask_valid.sum() - remaining.sum()
+        if dropped > 0:
+            print(f"⚠️  Dropped {dropped} rows due to {reason} '{col}'")
+        mask_valid = remaining
+    return mask_valid
+
+
 def clean_brands(df, needs_cleaning):
     """Clean brands dataset"""
     if not needs_cleaning:
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["brands"])
     df["brand_id"] = df["brand_id"].astype(int)
     df["brand_name"] = df["brand_name"].fillna("Unknown")
     after = len(df)
@@ -130,8 +317,7 @@ def clean_categories(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["categories"])
     df["category_id"] = df["category_id"].astype(int)
     df["category_name"] = df["category_name"].fillna("Unknown")
     after = len(df)
@@ -145,9 +331,7 @@ def clean_products(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["products"])
     df = df.dropna(subset=["product_id", "product_name"])
     df["model_year"] = df["model_year"].fillna(0).astype(int)
     df["product_id"] = df["product_id"].astype(int)
@@ -166,43 +350,54 @@ def clean_customers(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["customers"])
     df = df.dropna(subset=["customer_id"])
-    df["first_name"] = df["first_name"].fillna("Unknown")
-    df["last_name"] = df["last_name"].fillna("Unknown")
-    df["email"] = df["email"].fillna("unknown@email.com")
-    df["phone"] = df["phone"].fillna("Unknown")
-    df["street"] = df["street"].fillna("Unknown")
-    df["city"] = df["city"].fillna("Unknown")
-    df["state"] = df["state"].fillna("Unknown")
-    df["zip_code"] = df["zip_code"].fillna("00000")
+    df = df.fillna(TEXT_DEFAULTS["customers"])
     df["customer_id"] = df["customer_id"].astype(int)
 
     if "full_name" not in df.columns:
         df["full_name"] = df["first_name"] + " " + df["last_name"]
 
-    df["phone"] = (
-        df["phone"]
-        .astype(str)
-        .apply(lambda x: x.split(",")[0].strip() if "," in x else x)
-    )
-    df["phone"] = df["phone"].str.replace(r"\D", "", regex=True)
+    # Keep the first of several listed numbers, digits only
+    df["phone"] = digits_only(df["phone"].astype(str).str.split(",", n=1).str[0])
 
     after = len(df)
     return df, f"✓ Cleaned: {before} → {after} rows"
 
 
+def parse_and_fix_dates(values):
+    """Parse a column of dates (invalid -> NaT), moving years before 1900 forward"""
+    dates = pd.to_datetime(values, errors="coerce", format="mixed")
+
+    # Auto-correct years clearly out of range by whole millennia, keeping
+    # month, day and time; corrections that land on an invalid date are NaT
+    early = dates < EARLIEST_VALID_DATE
+    if early.any():
+        bad = dates[early]
+        year = bad.dt.year
+        corrected = pd.to_datetime(
+            pd.DataFrame({
+                "year": year + 1000 * ((2025 - year) // 1000 + 1),
+                "month": bad.dt.month,
+                "day": bad.dt.day,
+                "hour": bad.dt.hour,
+                "minute": bad.dt.minute,
+                "second": bad.dt.second,
+                "microsecond": bad.dt.microsecond,
+            }),
+            errors="coerce",
+        )
+        dates = dates.mask(early, corrected)
+    return dates
+
+
 def clean_orders(df, needs_cleaning):
     """Clean orders dataset with safe date parsing and auto-correction of malformed years"""
     if not needs_cleaning:
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["orders"])
     df = df.dropna(subset=["order_id", "customer_id"])
     df["order_id"] = df["order_id"].astype(int)
     df["customer_id"] = df["customer_id"].astype(int)
@@ -213,24 +408,8 @@ def clean_orders(df, needs_cleaning):
     # ----------------------------
     # Implicit date correction
     # ----------------------------
-    def parse_and_fix_date(date_str):
-        if pd.isna(date_str):
-            return pd.NaT
-        try:
-            dt = pd.to_datetime(date_str, errors="coerce")
-            if pd.isna(dt):
-                return pd.NaT
-            # Auto-correct years clearly out of range
-            if dt.year < 1900:
-                # Example: 1016 → 2016, 1610 → 2016, etc.
-                corrected_year = dt.year + 1000 * ((2025 - dt.year) // 1000 + 1)
-                dt = dt.replace(year=corrected_year)
-            return dt
-        except Exception:
-            return pd.NaT
-
     for col in ["order_date", "required_date", "shipped_date"]:
-        df[col] = df[col].apply(parse_and_fix_date)
+        df[col] = parse_and_fix_dates(df[col])
 
     # Optional: report any remaining invalid dates
     invalid_dates = df[df[["order_date", "required_date"]].isna().any(axis=1)]
@@ -249,33 +428,29 @@ def clean_order_items(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
     # Drop duplicates
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["order_items"])
 
     # Drop rows missing critical columns
     df = df.dropna(subset=["order_id", "product_id", "item_id"])
 
     # ----------------------------
-    # Safe integer conversion
+    # Safe numeric conversion
     # ----------------------------
-    for col in ["order_id", "item_id", "product_id", "quantity"]:
-        mask_valid = pd.to_numeric(df[col], errors='coerce').notna()
-        dropped = len(df) - mask_valid.sum()
-        if dropped > 0:
-            print(f"⚠️  Dropped {dropped} rows due to invalid '{col}'")
-        df = df[mask_valid].copy()
-        df[col] = df[col].astype(int)
-
-    # Safe float conversion
-    for col in ["list_price", "discount"]:
-        mask_valid = pd.to_numeric(df[col], errors='coerce').notna()
-        dropped = len(df) - mask_valid.sum()
-        if dropped > 0:
-            print(f"⚠️  Dropped {dropped} rows due to invalid '{col}'")
-        df = df[mask_valid].copy()
-        df[col] = df[col].astype(float)
+    # Every column is coerced once and invalid rows go in a single filter
+    int_columns = ["order_id", "item_id", "product_id", "quantity"]
+    float_columns = ["list_price", "discount"]
+    coerced = {
+        col: pd.to_numeric(df[col], errors="coerce") for col in int_columns + float_columns
+    }
+    mask_valid = valid_rows(
+        {col: values.notna() for col, values in coerced.items()}, "invalid"
+    )
+    df = df[mask_valid]
+    for col in int_columns:
+        df[col] = coerced[col][mask_valid].astype(int)
+    for col in float_columns:
+        df[col] = coerced[col][mask_valid].astype(float)
 
     # Filter invalid quantities
     df = df[df["quantity"] > 0]
@@ -290,38 +465,33 @@ def clean_staffs(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
     # Drop duplicates
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["staffs"])
 
     # Drop rows missing critical ID
     df = df.dropna(subset=["staff_id"])
 
     # Fill missing text fields
-    df["first_name"] = df["first_name"].fillna("Unknown")
-    df["last_name"] = df["last_name"].fillna("Unknown")
-    df["email"] = df["email"].fillna("unknown@email.com")
-    df["phone"] = df["phone"].fillna("Unknown")
+    df = df.fillna(TEXT_DEFAULTS["staffs"])
 
     # ----------------------------
     # Safe integer conversion
     # ----------------------------
     int_columns = ["staff_id", "store_id", "active", "manager_id"]
+    # A missing manager becomes 0; other missing or non-finite IDs drop the row
+    coerced = {
+        col: pd.to_numeric(df[col], errors="coerce") for col in int_columns
+    }
+    coerced["manager_id"] = coerced["manager_id"].fillna(0)
+    mask_valid = valid_rows(
+        {col: np.isfinite(values) for col, values in coerced.items()}, "invalid/non-finite"
+    )
+    df = df[mask_valid]
     for col in int_columns:
-        # Treat missing or non-finite values
-        if col == "manager_id":
-            # Fill NaN with 0 before conversion
-            df[col] = df[col].fillna(0)
-        mask_valid = pd.to_numeric(df[col], errors='coerce').notna() & np.isfinite(df[col])
-        dropped = len(df) - mask_valid.sum()
-        if dropped > 0:
-            print(f"⚠️  Dropped {dropped} rows due to invalid/non-finite '{col}'")
-        df = df[mask_valid].copy()
-        df[col] = df[col].astype(int)
+        df[col] = coerced[col][mask_valid].astype(int)
 
     # Clean phone numbers
-    df["phone"] = df["phone"].astype(str).str.replace(r"\D", "", regex=True)
+    df["phone"] = digits_only(df["phone"])
 
     after = len(df)
     return df, f"✓ Cleaned: {before} → {after} rows"
@@ -333,19 +503,11 @@ def clean_stores(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["stores"])
     df = df.dropna(subset=["store_id"])
-    df["store_name"] = df["store_name"].fillna("Unknown")
-    df["phone"] = df["phone"].fillna("Unknown")
-    df["email"] = df["email"].fillna("unknown@email.com")
-    df["street"] = df["street"].fillna("Unknown")
-    df["city"] = df["city"].fillna("Unknown")
-    df["state"] = df["state"].fillna("Unknown")
-    df["zip_code"] = df["zip_code"].fillna("00000")
+    df = df.fillna(TEXT_DEFAULTS["stores"])
     df["store_id"] = df["store_id"].astype(int)
-    df["phone"] = df["phone"].astype(str).str.replace(r"\D", "", regex=True)
+    df["phone"] = digits_only(df["phone"])
 
     after = len(df)
     return df, f"✓ Cleaned: {before} → {after} rows"
@@ -357,9 +519,7 @@ def clean_stocks(df, needs_cleaning):
         return df, "⊗ Skipped (clean)"
 
     before = len(df)
-    df = df.copy()
-
-    df = df.drop_duplicates()
+    df = df.drop_duplicates(subset=PRIMARY_KEYS["stocks"])
     df = df.dropna(subset=["store_id", "product_id"])
     df["store_id"] = df["store_id"].astype(int)
     df["product_id"] = df["product_id"].astype(int)
@@ -370,6 +530,30 @@ def clean_stocks(df, needs_cleaning):
     return df, f"✓ Cleaned: {before} → {after} rows"
 
 
+# Cleaning function per dataset, in the order results are reported
+CLEANERS = {
+    "brands": clean_brands,
+    "categories": clean_categories,
+    "products": clean_products,
+    "customers": clean_customers,
+    "orders": clean_orders,
+    "order_items": clean_order_items,
+    "staffs": clean_staffs,
+    "stores": clean_stores,
+    "stocks": clean_stocks,
+}
+
+
+def clean_table(task):
+    """Worker entry point: clean one dataset, returning (name, df, message)"""
+    name, df, needed = task
+    df, msg = CLEANERS[name](df, needed)
+    columns = [col for col in LOW_CARDINALITY_COLUMNS.get(name, []) if col in df.columns]
+    if columns:
+        df = df.astype(dict.fromkeys(columns, "category"))
+    return name, df, msg
+
+
 def clean_all_data(dfs, config):
     """Apply cleaning to datasets based on configuration"""
 
@@ -395,49 +579,29 @@ def clean_all_data(dfs, config):
     else:
         needs_cleaning = {name: True for name in dfs.keys()}
 
+    # Datasets are cleaned independently, so the ones needing work run in
+    # parallel; skipped ones are passed through without a round-trip
+    tasks = [
+        (name, dfs[name], needs_cleaning.get(name, True)) for name in CLEANERS if name in dfs
+    ]
+    parallel = [task for task in tasks if task[2]]
+    workers = max(1, min(len(parallel), MAX_WORKERS))
+    # Shallow sizes: enough to tell small inputs from large ones without
+    # walking every string in the object columns
+    input_bytes = sum(task[1].memory_usage(deep=False).sum() for task in parallel)
+    pool = ProcessPoolExecutor if input_bytes >= PROCESS_POOL_MIN_BYTES else ThreadPoolExecutor
+    with pool(max_workers=workers) as executor:
+        done = {name: (df, msg) for name, df, msg in executor.map(clean_table, parallel)}
+
     cleaned = {}
 
     print("\nCleaning datasets:")
 
-    df, msg = clean_brands(dfs["brands"], needs_cleaning.get("brands", True))
-    cleaned["brands"] = df
-    print(f"  brands         : {msg}")
-
-    df, msg = clean_categories(
-        dfs["categories"], needs_cleaning.get("categories", True)
-    )
-    cleaned["categories"] = df
-    print(f"  categories     : {msg}")
-
-    df, msg = clean_products(dfs["products"], needs_cleaning.get("products", True))
-    cleaned["products"] = df
-    print(f"  products       : {msg}")
-
-    df, msg = clean_customers(dfs["customers"], needs_cleaning.get("customers", True))
-    cleaned["customers"] = df
-    print(f"  customers      : {msg}")
-
-    df, msg = clean_orders(dfs["orders"], needs_cleaning.get("orders", True))
-    cleaned["orders"] = df
-    print(f"  orders         : {msg}")
-
-    df, msg = clean_order_items(
-        dfs["order_items"], needs_cleaning.get("order_items", True)
-    )
-    cleaned["order_items"] = df
-    print(f"  order_items    : {msg}")
-
-    df, msg = clean_staffs(dfs["staffs"], needs_cleaning.get("staffs", True))
-    cleaned["staffs"] = df
-    print(f"  staffs         : {msg}")
-
-    df, msg = clean_stores(dfs["stores"], needs_cleaning.get("stores", True))
-    cleaned["stores"] = df
-    print(f"  stores         : {msg}")
-
-    df, msg = clean_stocks(dfs["stocks"], needs_cleaning.get("stocks", True))
-    cleaned["stocks"] = df
-    print(f"  stocks         : {msg}")
+    for task in tasks:
+        name = task[0]
+        df, msg = done[name] if name in done else clean_table(task)[1:]
+        cleaned[name] = df
+        print(f"  {name:15}: {msg}")
 
     print("\n✓ Cleaning complete")
     return cleaned
@@ -448,6 +612,32 @@ def clean_all_data(dfs, config):
 # ============================================================================
 
 
+def item_totals(quantity, list_price, discount):
+    """quantity * list_price * (1 - discount), evaluated block by block"""
+    totals = np.empty(len(quantity))
+    scratch = np.empty(min(len(quantity), ITEM_TOTAL_BLOCK_ROWS))
+    # Same operations in the same order as the whole-column expression, but
+    # each block's intermediates stay in cache instead of full-length temporaries
+    for start in range(0, len(quantity), ITEM_TOTAL_BLOCK_ROWS):
+        stop = min(start + ITEM_TOTAL_BLOCK_ROWS, len(quantity))
+        block, factor = totals[start:stop], scratch[:stop - start]
+        np.multiply(quantity[start:stop], list_price[start:stop], out=block)
+        np.subtract(1, discount[start:stop], out=factor)
+        np.multiply(block, factor, out=block)
+    return totals
+
+
+def lookup_names(ids, names):
+    """Categorical of the names for each ID (names indexed by ID; unknown IDs are missing)"""
+    categories = pd.Index(names.dropna().unique()).sort_values()
+    # Each ID resolves to a row of the lookup and each row to a category code,
+    # so no name string is repeated per product; the trailing -1 (missing)
+    # is what unknown IDs, at position -1, pick up
+    positions = names.index.get_indexer(ids)
+    name_codes = np.append(categories.get_indexer(names), -1)
+    return pd.Categorical.from_codes(name_codes[positions], categories=categories)
+
+
 def transform_data(dfs, config):
     """Apply business transformations"""
 
@@ -462,40 +652,23 @@ def transform_data(dfs, config):
     transformations = config.get("transformations", {}) if config else {}
 
     # Enrich products with brand and category names
-    if transformations.get("enrich_products", {}).get("needed", True):
+    if "products" not in dfs:
+        print("\n1. ⊗ Products unchanged")
+    elif transformations.get("enrich_products", {}).get("needed", True):
         print("\n1. Enriching products with brand/category names...")
-        products = (
-            dfs["products"]
-            .merge(
-                dfs["brands"][["brand_id", "brand_name"]],
-                on="brand_id",
-                how="left",
-                suffixes=("", "_merge"),
-            )
-            .merge(
-                dfs["categories"][["category_id", "category_name"]],
-                on="category_id",
-                how="left",
-                suffixes=("", "_merge"),
-            )
-        )
-
-        # Handle column conflicts
-        if "brand_name_merge" in products.columns:
-            if (
-                "brand_name" not in products.columns
-                or products["brand_name"].isna().all()
-            ):
-                products["brand_name"] = products["brand_name_merge"]
-            products = products.drop("brand_name_merge", axis=1)
-
-        if "category_name_merge" in products.columns:
-            if (
-                "category_name" not in products.columns
-                or products["category_name"].isna().all()
-            ):
-                products["category_name"] = products["category_name_merge"]
-            products = products.drop("category_name_merge", axis=1)
+        # Names are looked up by ID rather than merged, so no product rows
+        # are copied and existing names are only filled when all missing
+        products = dfs["products"]
+        for name_column, id_column, source in (
+            ("brand_name", "brand_id", "brands"),
+            ("category_name", "category_id", "categories"),
+        ):
+            if name_column not in products.columns or products[name_column].isna().all():
+                if source not in dfs:
+                    print(f"   ⚠️  {source} not loaded, {name_column} left as is")
+                    continue
+                names = dfs[source].drop_duplicates(id_column).set_index(id_column)[name_column]
+                products[name_column] = lookup_names(products[id_column], names)
 
         dfs["products"] = products
         print(f"   ✓ Products enriched: {products.shape}")
@@ -503,14 +676,16 @@ def transform_data(dfs, config):
         print("\n1. ⊗ Products already enriched")
 
     # Calculate total_price in order_items
-    if transformations.get("calculate_item_total", {}).get("needed", True):
+    if "order_items" not in dfs:
+        print("\n2. ⊗ Order items unchanged")
+    elif transformations.get("calculate_item_total", {}).get("needed", True):
         print("\n2. Calculating item total prices...")
-        order_items = dfs["order_items"].copy()
+        order_items = dfs["order_items"]
         if "total_price" not in order_items.columns:
-            order_items["total_price"] = (
-                order_items["quantity"]
-                * order_items["list_price"]
-                * (1 - order_items["discount"])
+            order_items["total_price"] = item_totals(
+                order_items["quantity"].to_numpy(),
+                order_items["list_price"].to_numpy(),
+                order_items["discount"].to_numpy(),
             )
             dfs["order_items"] = order_items
         print(f"   ✓ Total revenue: ${order_items['total_price'].sum():,.2f}")
@@ -518,24 +693,19 @@ def transform_data(dfs, config):
         print("\n2. ⊗ Item totals already calculated")
 
     # Calculate order total amount
-    if transformations.get("calculate_order_total", {}).get("needed", True):
+    if "orders" not in dfs:
+        print("\n3. ⊗ Orders unchanged")
+    elif "order_items" not in dfs:
+        print("\n3. ⚠️  Order items not loaded, order totals skipped")
+    elif transformations.get("calculate_order_total", {}).get("needed", True):
         print("\n3. Calculating order totals...")
-        order_totals = (
-            dfs["order_items"].groupby("order_id")["total_price"].sum().reset_index()
-        )
-        order_totals.columns = ["order_id", "order_total"]
-
-        orders = dfs["orders"].merge(
-            order_totals, on="order_id", how="left", suffixes=("", "_new")
-        )
-
-        if "order_total_new" in orders.columns:
-            if (
-                "order_total" not in orders.columns
-                or orders["order_total"].isna().all()
-            ):
-                orders["order_total"] = orders["order_total_new"]
-            orders = orders.drop("order_total_new", axis=1)
+        orders = dfs["orders"]
+        if "order_total" not in orders.columns or orders["order_total"].isna().all():
+            # Totals are looked up by ID, so the groups need no sorting
+            order_totals = (
+                dfs["order_items"].groupby("order_id", sort=False)["total_price"].sum()
+            )
+            orders["order_total"] = orders["order_id"].map(order_totals)
 
         orders["order_total"] = orders["order_total"].fillna(0)
         dfs["orders"] = orders
@@ -552,8 +722,26 @@ def transform_data(dfs, config):
 # ============================================================================
 
 
-def save_cleaned_data(dfs):
-    """Save cleaned and transformed data to CSV"""
+def write_cleaned_file(df, output_path, name, extension):
+    """Write one cleaned table as cleaned_{name}.parquet or .csv"""
+    filename = output_path / f"cleaned_{name}.{extension}"
+    if extension == "csv":
+        df.to_csv(filename, index=False)
+    else:
+        # Mixed-type object columns (e.g. zip codes read as floats, filled
+        # with "00000") become text, as they would in a CSV
+        mixed = [col for col in df.columns if df[col].dtype == object]
+        df = df.astype({col: "str" for col in mixed})
+        df.to_parquet(filename, engine="pyarrow", compression="zstd", index=False)
+
+    # Drop a copy left by a run in the other format, so the loader
+    # cannot pick up stale data
+    other_extension = "parquet" if extension == "csv" else "csv"
+    (output_path / f"cleaned_{name}.{other_extension}").unlink(missing_ok=True)
+
+
+def save_cleaned_data(dfs, output_format=OUTPUT_FORMAT):
+    """Save cleaned and transformed data as Parquet or CSV"""
     print("\n" + "=" * 80)
     print("SAVING CLEANED DATA")
     print("=" * 80)
@@ -563,28 +751,154 @@ def save_cleaned_data(dfs):
         os.makedirs(output_path)
         print(f"✓ Created output directory: {output_path}")
 
+    extension = "csv" if output_format == "csv" else "parquet"
+
+    # Write every file at once; the writers release the GIL while encoding
+    # and compressing. Results are reported in table order
     print("\nSaving files:")
-    for name, df in dfs.items():
-        filename = output_path / f"cleaned_{name}.csv"
-        df.to_csv(filename, index=False)
-        print(f"  ✓ cleaned_{name}.csv ({len(df):,} rows)")
+    with ThreadPoolExecutor(max_workers=max(1, min(len(dfs), WRITE_WORKERS))) as executor:
+        futures = {
+            name: executor.submit(write_cleaned_file, df, output_path, name, extension)
+            for name, df in dfs.items()
+        }
+
+    for name, future in futures.items():
+        future.result()
+        print(f"  ✓ cleaned_{name}.{extension} ({len(dfs[name]):,} rows)")
 
     print(f"\n✓ All files saved to '{output_path}'")
     return True
 
 
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+
+def get_manifest_file():
+    """Record of the inputs behind each cleaned file"""
+    return get_cache_dir() / "transform" / "manifest.json"
+
+
+def hash_source_file(file_path):
+    """Content digest of a source file (None when it is missing)"""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def get_source_stats():
+    """[mtime_ns, size] of each source file (None when it is missing)"""
+    data_path = get_raw_data_dir()
+    stats = {}
+    for name, file in SOURCE_FILES.items():
+        try:
+            stat = os.stat(data_path / file)
+        except FileNotFoundError:
+            stats[name] = None
+            continue
+        stats[name] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def find_rewritten_tables(stats):
+    """Tables whose source, or a source feeding them, changed since stats were taken"""
+    moved = {name for name, stat in get_source_stats().items() if stat != stats[name]}
+    return {
+        name for name in SOURCE_FILES
+        if moved.intersection([name, *TABLE_DEPENDENCIES.get(name, [])])
+    }
+
+
+def get_table_keys(config, output_format):
+    """Digest per table of everything its cleaned file depends on"""
+    data_path = get_raw_data_dir()
+    sources = {name: hash_source_file(data_path / file) for name, file in SOURCE_FILES.items()}
+    config = config or {}
+    code = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).hexdigest()
+    shared = [
+        MANIFEST_VERSION, code, pd.__version__, config.get("pipeline_steps"),
+        config.get("transformations"), output_format, str(get_processed_data_dir()),
+    ]
+
+    keys = {}
+    for name in SOURCE_FILES:
+        # A table's own source and settings, plus those of the tables feeding it
+        inputs = {
+            table: [sources[table], config.get("datasets", {}).get(table)]
+            for table in [name, *TABLE_DEPENDENCIES.get(name, [])]
+        }
+        payload = json.dumps([shared, inputs], sort_keys=True, default=str)
+        keys[name] = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return keys
+
+
+def load_manifest():
+    """Manifest entries by table (empty when there is no readable manifest)"""
+    try:
+        return json.loads(get_manifest_file().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def find_unchanged_tables(keys):
+    """Row counts of the tables whose cleaned file matches its key and is intact"""
+    output_path = get_processed_data_dir()
+    manifest = load_manifest()
+    unchanged = {}
+    for name, key in keys.items():
+        entry = manifest.get(name)
+        if not entry or entry.get("key") != key:
+            continue
+        try:
+            stat = os.stat(output_path / entry["file"])
+        except FileNotFoundError:
+            continue
+        if [stat.st_mtime_ns, stat.st_size] == entry["stat"]:
+            unchanged[name] = entry["rows"]
+    return unchanged
+
+
+def save_manifest(keys, dfs, output_format):
+    """Record the key, file and row count of each table just written"""
+    output_path = get_processed_data_dir()
+    extension = "csv" if output_format == "csv" else "parquet"
+    manifest = load_manifest()
+    for name, df in dfs.items():
+        file = f"cleaned_{name}.{extension}"
+        stat = os.stat(output_path / file)
+        manifest[name] = {
+            "key": keys[name], "file": file,
+            "stat": [stat.st_mtime_ns, stat.st_size], "rows": len(df),
+        }
+
+    manifest_file = get_manifest_file()
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    manifest_file.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
 
-def main():
-    """Execute transformation pipeline"""
+def main(config=None, output_format=None):
+    """Execute transformation pipeline (config defaults to pipeline_config.yaml)"""
 
     print("\n🔄 Starting Transformation Pipeline...\n")
 
-    # Load configuration
-    config = load_config()
+    # --format=csv on the command line keeps the older CSV output
+    if output_format is None:
+        output_format = "csv" if "--format=csv" in sys.argv else OUTPUT_FORMAT
+
+    # Load configuration unless the caller already has it in memory
+    if config is None:
+        config = load_config()
     
     if config:
         print(f"\n✓ Configuration loaded")
@@ -592,16 +906,46 @@ def main():
     else:
         print("\n⚠️  Configuration not found or failed to load. Proceeding with defaults.")
 
-    # Load source data
-    dfs = load_data()
+    # Tables whose inputs match the manifest keep their cleaned files (sources
+    # are only hashed when the manifest is in use)
+    use_manifest = SKIP_UNCHANGED_TABLES and "--no-cache" not in sys.argv
+    keys, unchanged = {}, {}
+    if use_manifest:
+        stats = get_source_stats()
+        keys = get_table_keys(config, output_format)
+        unchanged = find_unchanged_tables(keys)
+    if len(unchanged) == len(SOURCE_FILES):
+        print("\n✓ Sources, configuration and code unchanged since the last run")
+        print("\n📊 Output Statistics:")
+        for name, count in unchanged.items():
+            print(f"  {name:15} : {count:,} rows")
+        print(f"\nCleaned data is up to date in: {get_processed_data_dir()}")
+        return True
+
+    # Load source data for the changed tables and the tables feeding them
+    changed = [name for name in SOURCE_FILES if name not in unchanged]
+    needed = set(changed).union(*(TABLE_DEPENDENCIES.get(name, []) for name in changed))
+    if unchanged:
+        print(f"\n✓ Reusing {len(unchanged)} unchanged table(s): {', '.join(unchanged)}")
+    dfs = load_data([name for name in SOURCE_FILES if name in needed])
 
     # Execute transformation steps
     dfs = standardize_columns(dfs, config)
     dfs = clean_all_data(dfs, config)
     dfs = transform_data(dfs, config)
 
-    # Save cleaned data
-    success = save_cleaned_data(dfs)
+    # Save cleaned data (tables loaded only to feed others are already saved)
+    written = {name: df for name, df in dfs.items() if name in changed}
+    success = save_cleaned_data(written, output_format)
+    if success and use_manifest:
+        # A source rewritten after it was hashed may not be what was read, so
+        # its tables are left out of the manifest and processed again next run
+        rewritten = find_rewritten_tables(stats).intersection(written)
+        if rewritten:
+            print(f"\n⚠️  Sources changed during the run: {', '.join(sorted(rewritten))}")
+        save_manifest(
+            keys, {name: df for name, df in written.items() if name not in rewritten}, output_format
+        )
 
     # Summary
     print("\n" + "=" * 80)
@@ -618,8 +962,11 @@ def main():
                 print(f"  {step:30} : {status}")
 
     print("\n📊 Output Statistics:")
-    for name, df in dfs.items():
-        print(f"  {name:15} : {len(df):,} rows")
+    for name in SOURCE_FILES:
+        if name in written:
+            print(f"  {name:15} : {len(written[name]):,} rows")
+        elif name in unchanged:
+            print(f"  {name:15} : {unchanged[name]:,} rows (unchanged)")
 
     print("\n" + "=" * 80)
     print("✓ TRANSFORMATION COMPLETE!")
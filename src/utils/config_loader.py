@@ -1,23 +1,40 @@
+from functools import lru_cache
 from pathlib import Path
+import copy
 import yaml
 import os
 
+@lru_cache(maxsize=None)
 def get_project_root() -> Path:
     """Returns the project root directory."""
     return Path(__file__).parent.parent.parent
 
+@lru_cache(maxsize=None)
 def get_config_path() -> Path:
     return get_project_root() / "config" / "pipeline_config.yaml"
 
+@lru_cache(maxsize=None)
 def get_raw_data_dir() -> Path:
     return get_project_root() / "data" / "raw"
 
+@lru_cache(maxsize=None)
 def get_processed_data_dir() -> Path:
     return get_project_root() / "data" / "processed"
 
+@lru_cache(maxsize=None)
+def get_cache_dir() -> Path:
+    return get_project_root() / ".cache"
+
+@lru_cache(maxsize=4)
+def _parse_config(config_path, mtime_ns, size):
+    """Parsed YAML for one version of the file (mtime and size key the cache)."""
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f)
+
 def load_config():
     config_path = get_config_path()
     if not config_path.exists():
         return None
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+    stat = config_path.stat()
+    # Re-parse only when the file changed; callers get their own copy to mutate
+    return copy.deepcopy(_parse_config(config_path, stat.st_mtime_ns, stat.st_size))
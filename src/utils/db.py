@@ -0,0 +1,61 @@
+"""
+DATABASE ENGINE
+Purpose: One shared SQL Server engine (and connection pool) per process
+Used by: src/load/sql_loader.py, scripts/reporting_script.py
+"""
+
+from sqlalchemy import create_engine
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# SQL Server connection settings
+SQL_SERVER = 'DESKTOP-LF8V7TT'
+SQL_DATABASE = 'RetailDB'
+SQL_DRIVER = 'ODBC Driver 17 for SQL Server'
+
+# Set to True for Windows Authentication, False for SQL Server Authentication
+USE_WINDOWS_AUTH = True
+
+# SQL Server Authentication credentials (if USE_WINDOWS_AUTH = False)
+SQL_USERNAME = 'your_username'
+SQL_PASSWORD = 'your_password'
+
+# Bind rows as parameter arrays instead of one round-trip per row (pyodbc)
+FAST_EXECUTEMANY = True
+
+# Pooled connections; reporting runs up to this many queries concurrently
+POOL_SIZE = 8
+
+_engine = None
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+def get_connection_string():
+    """Build the SQLAlchemy URL for the configured server and auth mode"""
+    if USE_WINDOWS_AUTH:
+        return (
+            f'mssql+pyodbc://{SQL_SERVER}/{SQL_DATABASE}?'
+            f'driver={SQL_DRIVER}&trusted_connection=yes'
+        )
+    return (
+        f'mssql+pyodbc://{SQL_USERNAME}:{SQL_PASSWORD}@'
+        f'{SQL_SERVER}/{SQL_DATABASE}?driver={SQL_DRIVER}'
+    )
+
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            get_connection_string(),
+            fast_executemany=FAST_EXECUTEMANY,
+            pool_size=POOL_SIZE,
+            max_overflow=0,
+        )
+    return _engine
@@ -8,11 +8,15 @@ import os
 # Ensure src module can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from src.extract import data_quality_check
 from src.extract.data_quality_check import (
     check_column_standardization,
     check_duplicates,
     check_missing_values,
-    check_data_types
+    check_data_types,
+    scan_dataset,
+    finalize_dataset,
+    analyze_columns
 )
 
 def test_check_column_standardization():
@@ -63,3 +67,92 @@ def test_check_data_types():
     assert result['needed'] == True
     assert 'order_date' in result['issues']
     assert result['issues']['order_date']['expected'] == 'datetime'
+
+def test_scan_dataset_chunked_matches_full_frame(tmp_path):
+    df = pd.DataFrame({
+        'product_id': [1, 2, 2, 3, 1, 4, 5],
+        'list_price': [10.0, -5.0, -5.0, None, 10.0, 7.5, -1.0]
+    })
+    path = tmp_path / 'products.csv'
+    df.to_csv(path, index=False)
+
+    acc, encoding = scan_dataset(path, 'products', chunksize=2, block_size=32)
+    result = finalize_dataset(acc, 'products')
+
+    assert encoding == 'utf-8'
+    assert result['row_count'] == 7
+    assert result['checks']['duplicates'] == check_duplicates(df)
+    assert result['checks']['missing_values'] == check_missing_values(df, 'products')
+    assert result['checks']['quality']['issues']['negative_prices'] == 3
+
+def test_analyze_columns_single_sweep():
+    df = pd.DataFrame({
+        'quantity': [1, 0, -2, 3],
+        'discount': [0.1, None, 1.5, -0.2],
+        'note': ['a', None, 'b', None]
+    })
+    null_counts, stats = analyze_columns(df, 'order_items')
+
+    assert null_counts.to_dict() == {'quantity': 0, 'discount': 1, 'note': 2}
+    assert stats['quantity']['negative'] == 1
+    assert stats['quantity']['zero'] == 1
+    assert stats['discount']['outside_unit'] == 2
+    assert 'note' not in stats
+
+def test_load_dataset_checks_reuses_cache(tmp_path, monkeypatch):
+    path = tmp_path / 'brands.csv'
+    pd.DataFrame({'brand_id': [1, 2], 'brand_name': ['A', 'B']}).to_csv(path, index=False)
+    monkeypatch.setattr(data_quality_check, 'get_cache_dir', lambda: tmp_path / '.cache')
+
+    first = data_quality_check.load_dataset_checks(path, 'brands')
+
+    def fail_scan(*args):
+        raise AssertionError('cache miss')
+
+    monkeypatch.setattr(data_quality_check, 'check_dataset', fail_scan)
+    second = data_quality_check.load_dataset_checks(path, 'brands')
+
+    assert second['dataset'] == first['dataset']
+
+def test_decision_mode_reads_headers_after_cleaning_needed(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_quality_check, 'USE_CACHE', False)
+    dirty = tmp_path / 'brands.csv'
+    pd.DataFrame({'brand_id': [1, 1], 'brand_name': ['A', 'A']}).to_csv(dirty, index=False)
+    later = tmp_path / 'stores.csv'
+    pd.DataFrame({'Store ID': [1]}).to_csv(later, index=False)
+
+    results = data_quality_check.check_files_for_decision(
+        [('brands', dirty), ('stores', later)]
+    )
+
+    assert results[0][1]['dataset']['checks']['duplicates']['count'] == 1
+    assert results[1][1]['dataset'] is None
+    assert list(results[1][1]['schema'].columns) == ['Store ID']
+
+def test_decision_mode_counts_only_analyzed_datasets(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_quality_check, 'USE_CACHE', False)
+    monkeypatch.setattr(data_quality_check, 'get_raw_data_dir', lambda: tmp_path)
+    pd.DataFrame({'brand_id': [1, 1], 'brand_name': ['A', 'A']}).to_csv(tmp_path / 'brands.csv', index=False)
+    pd.DataFrame({'Store ID': [1]}).to_csv(tmp_path / 'stores.csv', index=False)
+
+    config = data_quality_check.analyze_data_quality('decision')
+
+    # stores is only read for its header, so it is skipped, not analyzed
+    assert config['metadata']['datasets_analyzed'] == 1
+    assert config['metadata']['skipped_datasets'] == ['stores']
+
+def test_scan_dataset_stops_early(tmp_path):
+    df = pd.DataFrame({'product_id': [1, 1, 2, 3, 4, 5], 'list_price': [1.0] * 6})
+    path = tmp_path / 'products.csv'
+    df.to_csv(path, index=False)
+
+    acc, _ = scan_dataset(path, 'products', chunksize=2, block_size=16,
+                          stop=lambda acc: acc['row_count'] > 0)
+
+    assert acc['partial'] == True
+    assert acc['row_count'] < len(df)
+
+def test_customers_multiple_phones():
+    df = pd.DataFrame({'phone': ['555-1, 555-2', None, '555-3'], 'full_name': ['A', 'B', 'C']})
+    result = data_quality_check.check_customers_quality(df)
+    assert result['issues'] == {'multiple_phones': 1}
@@ -8,26 +8,230 @@ import os
 # Ensure src module can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.load.sql_loader import load_data_to_sql
+from src.load.sql_loader import load_data_to_sql, ensure_indexes, BATCH_SIZE, REPORTING_INDEXES
 
 def test_load_data_to_sql():
     # Mock dataframe
     df = pd.DataFrame({'id': [1], 'name': ['test']})
     dfs = {'brands': df}
     
-    # Mock SQLAlchemy engine
-    mock_engine = MagicMock()
+    # Mock SQLAlchemy connection
+    mock_conn = MagicMock()
     
     # Patch pandas to_sql to verify it's called
     with patch('pandas.DataFrame.to_sql') as mock_to_sql:
-        result = load_data_to_sql(dfs, mock_engine)
+        result = load_data_to_sql(dfs, mock_conn)
         
         assert result == True
         # Verify to_sql was called once for brands
         mock_to_sql.assert_called_once()
         args, kwargs = mock_to_sql.call_args
         
-        # Check arguments: table name, engine
+        # Check arguments: table name, the shared connection
         assert args[0] == 'Brands'
-        assert args[1] == mock_engine
+        assert args[1] == mock_conn
         assert kwargs['if_exists'] == 'append'
+        assert kwargs['chunksize'] == BATCH_SIZE
+
+def test_get_engine_is_shared():
+    from src.utils import db
+    
+    with patch('src.utils.db.create_engine') as mock_create, \
+         patch.object(db, '_engine', None):
+        first = db.get_engine()
+        second = db.get_engine()
+        
+        # One engine (and pool) per process, created on first use
+        assert first is second
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs['fast_executemany'] == db.FAST_EXECUTEMANY
+
+
+def test_ensure_indexes_is_idempotent():
+    conn = MagicMock()
+    
+    assert ensure_indexes(conn) == True
+    assert conn.execute.call_count == len(REPORTING_INDEXES)
+    
+    # Every statement checks for the index before creating it
+    for call, (index_name, table, _, _) in zip(conn.execute.call_args_list, REPORTING_INDEXES):
+        sql = call.args[0].text
+        assert sql.startswith("IF NOT EXISTS")
+        assert f"CREATE NONCLUSTERED INDEX {index_name} ON {table}" in sql
+
+def test_insert_options_without_fast_executemany():
+    from src.load import sql_loader
+    
+    with patch.object(sql_loader, 'FAST_EXECUTEMANY', False):
+        options = sql_loader.insert_options(7)
+    
+    # Multi-row INSERTs stay under SQL Server's 2100-parameter limit
+    assert options['method'] == 'multi'
+    assert options['chunksize'] * 7 < sql_loader.MAX_STATEMENT_PARAMETERS
+    assert sql_loader.insert_options(7) == {'chunksize': BATCH_SIZE}
+
+def test_load_cleaned_data_reads_every_file(tmp_path):
+    from src.load import sql_loader
+    
+    names = ['brands', 'categories', 'products', 'customers', 'orders',
+             'order_items', 'staffs', 'stores', 'stocks']
+    for i, name in enumerate(names):
+        pd.DataFrame({'id': range(i + 1)}).to_csv(tmp_path / f'cleaned_{name}.csv', index=False)
+    
+    with patch.object(sql_loader, 'get_processed_data_dir', return_value=tmp_path), \
+         patch.object(sql_loader, 'get_cache_dir', return_value=tmp_path / '.cache'):
+        dfs = sql_loader.load_cleaned_data()
+    
+    # Every table comes back, each with its own file's rows
+    assert list(dfs) == names
+    assert [len(df) for df in dfs.values()] == list(range(1, len(names) + 1))
+    
+    (tmp_path / 'cleaned_stocks.csv').unlink()
+    with patch.object(sql_loader, 'get_processed_data_dir', return_value=tmp_path), \
+         patch.object(sql_loader, 'get_cache_dir', return_value=tmp_path / '.cache'):
+        assert sql_loader.load_cleaned_data() is None
+
+def test_read_cleaned_csv_keeps_sql_types(tmp_path):
+    from src.load import sql_loader
+    
+    path = tmp_path / 'cleaned_customers.csv'
+    path.write_text("customer_id,phone,zip_code\n1,5551234,01234\n2,,14127\n")
+    with patch.object(sql_loader, 'USE_LOAD_CACHE', False):
+        df = sql_loader.read_cleaned_csv(path, 'customers')
+    
+    # Text columns stay text (leading zeros kept) and empty cells are missing
+    assert df['zip_code'].tolist() == ['01234', '14127']
+    assert df['phone'].iloc[0] == '5551234'
+    assert pd.isna(df['phone'].iloc[1])
+    assert str(df['customer_id'].dtype) == 'int32'
+
+def test_read_cleaned_csv_reuses_parquet_cache(tmp_path):
+    from src.load import sql_loader
+    
+    path = tmp_path / 'cleaned_customers.csv'
+    path.write_text("customer_id,phone,zip_code\n1,5551234,01234\n2,,14127\n")
+    
+    with patch.object(sql_loader, 'get_cache_dir', return_value=tmp_path / '.cache'), \
+         patch.object(sql_loader, 'parse_cleaned_csv', wraps=sql_loader.parse_cleaned_csv) as parse:
+        first = sql_loader.read_cleaned_csv(path, 'customers')
+        second = sql_loader.read_cleaned_csv(path, 'customers')
+        
+        # The second read comes from Parquet, with the same values and types
+        assert parse.call_count == 1
+        pd.testing.assert_frame_equal(first, second)
+        
+        path.write_text("customer_id,phone,zip_code\n3,5559999,02134\n")
+        third = sql_loader.read_cleaned_csv(path, 'customers')
+        assert parse.call_count == 2
+        assert third['zip_code'].tolist() == ['02134']
+    
+    # Only the entry for the current file is kept
+    assert len(list((tmp_path / '.cache' / 'sql_loader').glob('customers_*.parquet'))) == 1
+
+def test_read_cleaned_parquet_matches_csv(tmp_path):
+    from src.load import sql_loader
+
+    df = pd.DataFrame({
+        'customer_id': [1, 2],
+        'phone': ['5551234', ''],
+        'zip_code': ['01234', '14127'],
+        'city': pd.Categorical(['Buffalo', 'Buffalo']),
+    })
+    df.to_csv(tmp_path / 'cleaned_customers.csv', index=False)
+    df.to_parquet(tmp_path / 'cleaned_customers.parquet', index=False)
+
+    # The Parquet output is preferred and loads exactly as the CSV would
+    assert sql_loader.find_cleaned_file(tmp_path, 'customers').suffix == '.parquet'
+    with patch.object(sql_loader, 'USE_LOAD_CACHE', False):
+        from_csv = sql_loader.read_cleaned_csv(tmp_path / 'cleaned_customers.csv', 'customers')
+    from_parquet = sql_loader.read_cleaned_parquet(tmp_path / 'cleaned_customers.parquet', 'customers')
+    pd.testing.assert_frame_equal(from_parquet, from_csv)
+
+def test_prepare_for_reload_empties_children_first():
+    from src.load.sql_loader import prepare_for_reload, SCHEMA_TABLES
+    
+    conn = MagicMock()
+    
+    assert prepare_for_reload(conn) == True
+    statements = [call.args[0].text for call in conn.execute.call_args_list]
+    
+    # Constraints go off before any table is emptied
+    assert statements[0] == "ALTER TABLE Brands NOCHECK CONSTRAINT ALL"
+    
+    # Referenced tables can only be DELETEd, and only after their children
+    emptied = [s for s in statements if s.startswith(("TRUNCATE", "DELETE"))]
+    assert emptied[0] == "TRUNCATE TABLE Stocks"
+    assert emptied[1] == "TRUNCATE TABLE OrderItems"
+    assert emptied[-1] == "DELETE FROM Brands"
+    assert len(emptied) == len(SCHEMA_TABLES)
+    assert not any("DROP" in s for s in statements)
+
+
+def test_restore_constraints_validates_every_table():
+    from src.load.sql_loader import restore_constraints, SCHEMA_TABLES
+    
+    conn = MagicMock()
+    
+    assert restore_constraints(conn) == True
+    statements = [call.args[0].text for call in conn.execute.call_args_list]
+    assert statements == [
+        f"ALTER TABLE {table} WITH CHECK CHECK CONSTRAINT ALL" for table in SCHEMA_TABLES
+    ]
+
+def test_verify_data_load_single_query():
+    from src.load.sql_loader import verify_data_load, SCHEMA_TABLES
+    
+    conn = MagicMock()
+    conn.execute.return_value.fetchall.return_value = [(table, 1) for table in SCHEMA_TABLES]
+    
+    assert verify_data_load(conn) == True
+    
+    # All nine counts come back from one statement
+    conn.execute.assert_called_once()
+    assert conn.execute.call_args.args[0].text.count("UNION ALL") == len(SCHEMA_TABLES) - 1
+
+def test_bulk_insert_stages_csv(tmp_path):
+    from src.load import sql_loader
+    
+    df = pd.DataFrame({
+        'order_id': [1, 2],
+        'order_date': pd.to_datetime(['2016-01-01', '2016-01-02']),
+        'shipped_date': pd.to_datetime(['2016-01-03', None]),
+    })
+    conn = MagicMock()
+    staged = {}
+    conn.execute.side_effect = lambda clause: staged.update(
+        sql=clause.text, csv=(tmp_path / 'Orders.csv').read_text()
+    )
+    
+    with patch.object(sql_loader, 'BULK_INSERT_DIR', str(tmp_path)):
+        sql_loader.bulk_insert(conn, df, 'Orders')
+    
+    # Headerless CSV with ISO timestamps and empty NULLs, removed afterwards
+    assert staged['csv'].splitlines() == [
+        '1,2016-01-01T00:00:00,2016-01-03T00:00:00',
+        '2,2016-01-02T00:00:00,',
+    ]
+    assert staged['sql'].startswith(f"BULK INSERT Orders FROM '{tmp_path / 'Orders.csv'}'")
+    assert 'TABLOCK' in staged['sql'] and 'KEEPNULLS' in staged['sql']
+    assert not (tmp_path / 'Orders.csv').exists()
+
+def test_failed_reload_rolls_back_in_one_transaction():
+    from src.load import sql_loader
+    
+    engine = MagicMock()
+    conn = engine.connect.return_value.__enter__.return_value
+    
+    with patch.object(sql_loader, 'load_cleaned_data', return_value={'brands': pd.DataFrame()}), \
+         patch.object(sql_loader, 'create_sql_connection', return_value=engine), \
+         patch.object(sql_loader, 'create_database_schema', return_value=True), \
+         patch.object(sql_loader, 'load_data_to_sql', return_value=False), \
+         patch.object(sql_loader, 'restore_constraints') as restore:
+        assert sql_loader.main() == False
+    
+    # Emptying and disabling happened in the same transaction that is rolled back
+    conn.begin.assert_called_once()
+    conn.begin.return_value.rollback.assert_called_once()
+    conn.begin.return_value.commit.assert_not_called()
+    restore.assert_not_called()
+    assert any("DELETE FROM Brands" in call.args[0].text for call in conn.execute.call_args_list)
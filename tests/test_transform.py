@@ -3,6 +3,7 @@ import pytest
 import pandas as pd
 import sys
 import os
+from unittest.mock import patch
 
 # Ensure src module can be imported
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -10,7 +11,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.transform.transform_pipeline import (
     standardize_columns,
     clean_brands,
-    clean_products
+    clean_products,
+    clean_order_items,
+    parse_and_fix_dates,
+    read_source_csv,
+    save_cleaned_data
 )
 
 def test_standardize_columns():
@@ -37,6 +42,34 @@ def test_clean_brands():
     assert len(cleaned_df) == 2  # Duplicates removed
     assert cleaned_df.loc[cleaned_df['brand_id'] == 2, 'brand_name'].iloc[0] == 'Unknown' # Fillna works
 
+def test_clean_brands_keeps_first_row_per_key():
+    df = pd.DataFrame({
+        'brand_id': [1, 2, 1],
+        'brand_name': ['Nike', 'Trek', 'Nike Inc']
+    })
+    
+    cleaned_df, msg = clean_brands(df, True)
+    
+    # A repeated primary key is a duplicate even when other columns differ
+    assert cleaned_df['brand_id'].tolist() == [1, 2]
+    assert cleaned_df['brand_name'].tolist() == ['Nike', 'Trek']
+
+def test_cleaners_leave_input_untouched():
+    df = pd.DataFrame({
+        'product_id': [1, 2],
+        'product_name': ['Bike', None],
+        'brand_id': [1, 2],
+        'category_id': [1, 1],
+        'model_year': [2016, 2017],
+        'list_price': [10.0, None]
+    })
+    original = df.copy()
+    
+    clean_products(df, True)
+    
+    # Cleaners only assign to the new frame drop_duplicates returns, never to their input
+    pd.testing.assert_frame_equal(df, original)
+
 def test_clean_products():
     df = pd.DataFrame({
         'product_id': [1, 2, 3],
@@ -52,3 +85,188 @@ def test_clean_products():
     # Negative price should be removed
     assert len(cleaned_df) == 2
     assert 2 not in cleaned_df['product_id'].values
+
+def test_read_source_csv_flags_non_utf8_text(tmp_path):
+    path = tmp_path / 'brands.csv'
+    path.write_bytes("brand_id,brand_name\n1,Café\n2,\n".encode('latin-1'))
+    
+    # Invalid UTF-8 must surface as a decode error so load_data retries latin-1
+    with pytest.raises(UnicodeDecodeError):
+        read_source_csv(path)
+    
+    df = read_source_csv(path, encoding='latin-1')
+    assert df['brand_name'].iloc[0] == 'Café'
+    assert pd.isna(df['brand_name'].iloc[1])
+
+def test_load_source_file_reuses_parquet_cache(tmp_path):
+    from src.transform import transform_pipeline
+    
+    path = tmp_path / 'brands.csv'
+    path.write_bytes("brand_id,brand_name\n1,Café\n".encode('latin-1'))
+    
+    with patch.object(transform_pipeline, 'get_cache_dir', return_value=tmp_path / '.cache'), \
+         patch.object(transform_pipeline, 'parse_source_csv', wraps=transform_pipeline.parse_source_csv) as parse:
+        first, first_encoding = transform_pipeline.load_source_file(path)
+        second, second_encoding = transform_pipeline.load_source_file(path)
+    
+    # UTF-8 attempt + latin-1 retry once; the second read comes from Parquet
+    assert parse.call_count == 2
+    pd.testing.assert_frame_equal(first, second)
+    assert first_encoding == second_encoding == 'latin-1'
+
+def test_parse_and_fix_dates():
+    values = pd.Series(['2016-01-02', '1016-03-04 10:30:00', 'garbage', None, '1600-02-29'])
+    
+    dates = parse_and_fix_dates(values)
+    
+    assert dates.iloc[0] == pd.Timestamp('2016-01-02')
+    assert dates.iloc[1] == pd.Timestamp('3016-03-04 10:30:00')  # Year moved forward, time kept
+    assert dates.iloc[2:].isna().all()  # Unparseable, missing, and no Feb 29 in 2600
+
+def test_clean_order_items_drops_invalid_numbers(capsys):
+    df = pd.DataFrame({
+        'order_id': [1, 2, 'x', 4],
+        'item_id': [1, 1, 1, 1],
+        'product_id': [1, 2, 3, 4],
+        'quantity': [1, 'many', 2, 0],
+        'list_price': [10.0, 20.0, 30.0, 'n/a'],
+        'discount': [0.1, 0.0, 0.0, 0.0]
+    })
+    
+    cleaned_df, msg = clean_order_items(df, True)
+    
+    # Each bad row is reported once, against the first invalid column
+    out = capsys.readouterr().out
+    assert "Dropped 1 rows due to invalid 'order_id'" in out
+    assert "Dropped 1 rows due to invalid 'quantity'" in out
+    assert "Dropped 1 rows due to invalid 'list_price'" in out
+    assert cleaned_df['order_id'].tolist() == [1]
+    assert cleaned_df['quantity'].dtype == int
+    assert cleaned_df['list_price'].dtype == float
+
+def test_save_cleaned_data_writes_each_format(tmp_path):
+    dfs = {
+        'brands': pd.DataFrame({'brand_id': [1, 2], 'brand_name': ['Trek', 'Surly']}),
+        'stores': pd.DataFrame({'store_id': [1, 2], 'zip_code': pd.Series([14127.0, '00000'], dtype=object)}),
+    }
+    
+    with patch('src.transform.transform_pipeline.get_processed_data_dir', return_value=tmp_path):
+        assert save_cleaned_data(dfs, 'csv')
+        assert save_cleaned_data(dfs)
+    
+    # Parquet replaces the earlier CSVs; mixed zip codes are stored as text
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['cleaned_brands.parquet', 'cleaned_stores.parquet']
+    assert pd.read_parquet(tmp_path / 'cleaned_stores.parquet')['zip_code'].tolist() == ['14127.0', '00000']
+
+def test_clean_all_data_uses_threads_for_small_inputs():
+    from src.transform import transform_pipeline
+    
+    dfs = {name: pd.DataFrame() for name in transform_pipeline.CLEANERS}
+    dfs['brands'] = pd.DataFrame({'brand_id': [1, 1, 2], 'brand_name': ['Nike', 'Nike', None]})
+    config = {
+        'pipeline_steps': {'data_cleaning': True},
+        'datasets': {
+            name: {'checks': {
+                'duplicates': {'needed': name == 'brands'},
+                'missing_values': {'needed': False},
+                'data_types': {'needed': False},
+            }}
+            for name in dfs
+        },
+    }
+    
+    # A few rows never pay for worker processes
+    with patch.object(transform_pipeline, 'ProcessPoolExecutor') as processes:
+        cleaned = transform_pipeline.clean_all_data(dfs, config)
+    
+    processes.assert_not_called()
+    assert len(cleaned['brands']) == 2
+    assert cleaned['stocks'] is dfs['stocks']  # Skipped tables pass straight through
+
+def test_item_totals_matches_column_expression():
+    from src.transform import transform_pipeline
+    import numpy as np
+    
+    rng = np.random.default_rng(0)
+    quantity = rng.integers(1, 5, 1000)
+    list_price = rng.random(1000) * 1000
+    discount = rng.choice([0.0, 0.05, 0.1, 0.2], 1000)
+    
+    # Several blocks plus a ragged last one give bit-identical results
+    with patch.object(transform_pipeline, 'ITEM_TOTAL_BLOCK_ROWS', 64):
+        totals = transform_pipeline.item_totals(quantity, list_price, discount)
+    assert np.array_equal(totals, quantity * list_price * (1 - discount))
+
+def test_manifest_matches_only_unchanged_outputs(tmp_path):
+    from src.transform import transform_pipeline
+    
+    dfs = {'brands': pd.DataFrame({'brand_id': [1, 2], 'brand_name': ['Trek', 'Surly']})}
+    with patch.object(transform_pipeline, 'get_processed_data_dir', return_value=tmp_path), \
+         patch.object(transform_pipeline, 'get_cache_dir', return_value=tmp_path / '.cache'):
+        save_cleaned_data(dfs, 'csv')
+        transform_pipeline.save_manifest({'brands': 'key'}, dfs, 'csv')
+        
+        # Same key and an untouched file: the recorded row count comes back
+        assert transform_pipeline.find_unchanged_tables({'brands': 'key'}) == {'brands': 2}
+        assert transform_pipeline.find_unchanged_tables({'brands': 'other'}) == {}
+        
+        (tmp_path / 'cleaned_brands.csv').write_text("brand_id,brand_name\n1,Trek\n")
+        assert transform_pipeline.find_unchanged_tables({'brands': 'key'}) == {}
+
+def test_table_keys_follow_source_contents_and_dependencies(tmp_path):
+    from src.transform import transform_pipeline
+    
+    for name, file in transform_pipeline.SOURCE_FILES.items():
+        (tmp_path / file).write_text(f"{name}_id\n1\n")
+    
+    with patch.object(transform_pipeline, 'get_raw_data_dir', return_value=tmp_path):
+        before = transform_pipeline.get_table_keys(None, 'parquet')
+        (tmp_path / 'brands.csv').write_text("brand_id\n1\n2\n")
+        after = transform_pipeline.get_table_keys(None, 'parquet')
+    
+    # New brands change the brands file and the products enriched from it, nothing else
+    changed = {name for name in before if before[name] != after[name]}
+    assert changed == {'brands', 'products'}
+
+def test_lookup_names_matches_map():
+    from src.transform.transform_pipeline import lookup_names
+    
+    names = pd.Series(['Trek', None, 'Surly'], index=[3, 5, 1])
+    ids = pd.Series([1, 3, 3, 5, 9])
+    
+    result = lookup_names(ids, names)
+    
+    # Same names as Series.map, held as categories; unknown IDs and missing names stay missing
+    values = pd.Series(result)
+    assert str(values.dtype) == 'category'
+    assert values[:3].tolist() == ['Surly', 'Trek', 'Trek']
+    assert values[3:].isna().all()
+
+def test_sources_rewritten_during_run_are_detected(tmp_path):
+    from src.transform import transform_pipeline
+    
+    for name, file in transform_pipeline.SOURCE_FILES.items():
+        (tmp_path / file).write_text(f"{name}_id\n1\n")
+    
+    with patch.object(transform_pipeline, 'get_raw_data_dir', return_value=tmp_path):
+        stats = transform_pipeline.get_source_stats()
+        assert transform_pipeline.find_rewritten_tables(stats) == set()
+        
+        (tmp_path / 'order_items.csv').write_text("order_items_id\n1\n2\n")
+        rewritten = transform_pipeline.find_rewritten_tables(stats)
+    
+    # The rewritten source and the orders totalled from it are not recorded
+    assert rewritten == {'order_items', 'orders'}
+
+def test_transform_data_without_feeding_tables():
+    from src.transform.transform_pipeline import transform_data
+    
+    dfs = {
+        'products': pd.DataFrame({'product_id': [1], 'brand_id': [1], 'category_id': [1]}),
+        'orders': pd.DataFrame({'order_id': [1]}),
+    }
+    
+    # Tables that were not loaded are skipped rather than raising KeyError
+    result = transform_data(dfs, None)
+    assert 'brand_name' not in result['products'].columns
+    assert 'order_total' not in result['orders'].columns
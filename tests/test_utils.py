@@ -0,0 +1,27 @@
+import sys
+import os
+from unittest.mock import patch
+
+# Ensure src module can be imported
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import config_loader
+
+def test_load_config_reparses_only_when_changed(tmp_path):
+    config_file = tmp_path / "pipeline_config.yaml"
+    config_file.write_text("pipeline_steps:\n  clean_products: true\n")
+    
+    with patch.object(config_loader, 'get_config_path', return_value=config_file), \
+         patch.object(config_loader.yaml, 'safe_load', wraps=config_loader.yaml.safe_load) as parse:
+        first = config_loader.load_config()
+        first['pipeline_steps']['clean_products'] = False
+        second = config_loader.load_config()
+        
+        # Cached parse, but each caller gets its own copy
+        assert parse.call_count == 1
+        assert second['pipeline_steps']['clean_products'] is True
+        
+        config_file.write_text("pipeline_steps:\n  clean_products: false\n  clean_orders: true\n")
+        third = config_loader.load_config()
+        assert parse.call_count == 2
+        assert third['pipeline_steps'] == {'clean_products': False, 'clean_orders': True}